@@ -1,6 +1,6 @@
 from flask import Flask
 from commons import config
-from libs.models.users import SQLModel, create_engine, create_table
+from libs.models.users import SQLModel, create_engine, create_table, remove_session
 
 # from sqlmodel import SQLModel, create_engine
 from flask_jwt_extended import JWTManager
@@ -18,9 +18,19 @@ def create_app():
     migrate = Migrate(app, SQLModel)
     from routes.auth import auth_bp
     from routes.pokemon import pokemon_bp
+    from routes.metrics import metrics_bp
+    from libs.pokemon_job_queue import worker_pool
+    from commands import check_aggregates, import_dump, ingest_dex
 
     app.register_blueprint(auth_bp, url_prefix="/auth")
     app.register_blueprint(pokemon_bp, url_prefix="/v1")
+    app.register_blueprint(metrics_bp)
+    app.teardown_appcontext(remove_session)
+    # Workers start with the first request so CLI commands (e.g. migrations) don't run jobs.
+    app.before_request(worker_pool.start)
+    app.cli.add_command(ingest_dex)
+    app.cli.add_command(check_aggregates)
+    app.cli.add_command(import_dump)
     return app
 
 
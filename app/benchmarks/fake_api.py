@@ -0,0 +1,243 @@
+"""Local stand-in for the PokeAPI ``/pokemon`` endpoints.
+
+Run from ``app/`` and point ``POKEMON_API_URL`` at it::
+
+    python -m benchmarks.fake_api --port 8765 --latency 0.05 --jitter 0.02 \\
+        --throttle-rate 0.02 --error-rate 0.05
+    export POKEMON_API_URL=http://127.0.0.1:8765/api/v2/pokemon
+
+Pokemons are served from ``--fixtures`` (one ``<id>.json`` per pokemon,
+recorded from the real API with ``--record``) and otherwise generated by
+``benchmarks.payloads``, named ``poke-<id>``. ``GET /_stats`` returns the
+number of responses sent per status code.
+"""
+
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+import httpx
+
+from benchmarks import payloads
+
+PREFIX = "/api/v2/pokemon"
+ERROR_STATUS_CODES = (500, 502, 503, 504)
+
+
+class FakePokeAPI:
+    """Payload source and fault injection shared by every request handler."""
+
+    def __init__(
+        self,
+        count=1025,
+        fixtures=None,
+        record=None,
+        latency=0.0,
+        jitter=0.0,
+        throttle_rate=0.0,
+        error_rate=0.0,
+        retry_after=1,
+        seed=None,
+    ):
+        self.count = count
+        self.fixtures = Path(fixtures) if fixtures else None
+        self.record = record.rstrip("/") if record else None
+        self.latency = latency
+        self.jitter = jitter
+        self.throttle_rate = throttle_rate
+        self.error_rate = error_rate
+        self.retry_after = retry_after
+        self.stats = {}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._bodies = {}
+        if self.fixtures:
+            self.fixtures.mkdir(parents=True, exist_ok=True)
+
+    def count_status(self, status):
+        with self._lock:
+            self.stats[status] = self.stats.get(status, 0) + 1
+
+    def delay(self):
+        with self._lock:
+            jitter = self._random.uniform(0, self.jitter) if self.jitter else 0.0
+        return self.latency + jitter
+
+    def injected_status(self):
+        """429, a 5xx status or ``None``, drawn from the configured rates."""
+        with self._lock:
+            draw = self._random.random()
+            if draw < self.throttle_rate:
+                return 429
+            if draw < self.throttle_rate + self.error_rate:
+                return self._random.choice(ERROR_STATUS_CODES)
+        return None
+
+    def pokemon_id(self, name):
+        if name.isdigit():
+            return int(name)
+        if name.startswith("poke-") and name[5:].isdigit():
+            return int(name[5:])
+        return None
+
+    def fixture(self, name):
+        """Recorded payload body for ``name``, fetched from ``--record`` on a miss."""
+        if not self.fixtures:
+            return None
+        path = self.fixtures / f"{name}.json"
+        if path.exists():
+            return path.read_bytes()
+        if not self.record:
+            return None
+        response = httpx.get(f"{self.record}/{name}", timeout=30)
+        if response.status_code != 200:
+            return None
+        payload = response.json()
+        for key in (payload["id"], payload["name"]):
+            (self.fixtures / f"{key}.json").write_bytes(response.content)
+        return response.content
+
+    def pokemon(self, name):
+        """JSON body of pokemon ``name`` (id or name), or ``None`` if unknown."""
+        with self._lock:
+            body = self._bodies.get(name)
+        if body is not None:
+            return body
+        body = self.fixture(name)
+        if body is None:
+            pokemon_id = self.pokemon_id(name)
+            if pokemon_id is None or not 1 <= pokemon_id <= self.count:
+                return None
+            body = json.dumps(payloads.make_payload(pokemon_id)).encode()
+        with self._lock:
+            self._bodies[name] = body
+        return body
+
+    def page(self, offset, limit):
+        names = range(offset + 1, min(offset + limit, self.count) + 1)
+        following = offset + limit < self.count
+        return {
+            "count": self.count,
+            "next": (
+                f"{PREFIX}?offset={offset + limit}&limit={limit}" if following else None
+            ),
+            "previous": None,
+            "results": [
+                {"name": f"poke-{pokemon_id}", "url": f"{PREFIX}/{pokemon_id}/"}
+                for pokemon_id in names
+            ],
+        }
+
+
+class Handler(BaseHTTPRequestHandler):
+    api = None
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def send(self, status, body=b"", headers=None):
+        self.api.count_status(status)
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_json(self, data):
+        body = json.dumps(data).encode()
+        self.send(200, body, {"Content-Type": "application/json"})
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        path = url.path.rstrip("/")
+        if path == "/_stats":
+            return self.send_json(self.api.stats)
+        if not path.startswith(PREFIX):
+            return self.send(404, b"Not Found")
+        time.sleep(self.api.delay())
+        status = self.api.injected_status()
+        if status == 429:
+            return self.send(429, headers={"Retry-After": str(self.api.retry_after)})
+        if status is not None:
+            return self.send(status, b"Injected failure")
+        if path == PREFIX:
+            query = parse_qs(url.query)
+            offset = int(query.get("offset", ["0"])[0])
+            limit = int(query.get("limit", ["20"])[0])
+            return self.send_json(self.api.page(offset, limit))
+        body = self.api.pokemon(path[len(PREFIX) + 1 :].lower())
+        if body is None:
+            return self.send(404, b"Not Found")
+        etag = f'"{hashlib.sha256(body).hexdigest()[:16]}"'
+        if self.headers.get("If-None-Match") == etag:
+            return self.send(304, headers={"ETag": etag})
+        self.send(200, body, {"Content-Type": "application/json", "ETag": etag})
+
+
+def serve(host="127.0.0.1", port=8765, **options):
+    """Start the fake API in a daemon thread and return its server."""
+    handler = type("FakePokeAPIHandler", (Handler,), {"api": FakePokeAPI(**options)})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--count", type=int, default=1025, help="Pokemons listed.")
+    parser.add_argument("--fixtures", type=Path, help="Directory of recorded payloads.")
+    parser.add_argument(
+        "--record",
+        help="API URL to fetch and save fixtures from on a miss, "
+        "e.g. https://pokeapi.co/api/v2/pokemon.",
+    )
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds.")
+    parser.add_argument(
+        "--jitter", type=float, default=0.0, help="Up to this many extra seconds."
+    )
+    parser.add_argument(
+        "--throttle-rate", type=float, default=0.0, help="Fraction answered 429."
+    )
+    parser.add_argument(
+        "--error-rate", type=float, default=0.0, help="Fraction answered 5xx."
+    )
+    parser.add_argument("--retry-after", type=int, default=1)
+    parser.add_argument("--seed", type=int)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    server = serve(
+        args.host,
+        args.port,
+        count=args.count,
+        fixtures=args.fixtures,
+        record=args.record,
+        latency=args.latency,
+        jitter=args.jitter,
+        throttle_rate=args.throttle_rate,
+        error_rate=args.error_rate,
+        retry_after=args.retry_after,
+        seed=args.seed,
+    )
+    print(f"Serving http://{args.host}:{args.port}{PREFIX}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+"""Fire concurrent collect and read traffic at a running app.
+
+Start the fake API, then the app pointed at it, then the driver::
+
+    python -m benchmarks.fake_api --latency 0.05 --error-rate 0.02
+    POKEMON_API_URL=http://127.0.0.1:8765/api/v2/pokemon flask --app app run
+    python -m benchmarks.load --duration 30 --collect-workers 2 --read-workers 8
+
+Collects post ``--collect-size`` random pokemons with ``sync=true``, or
+queue a job and poll it until it finishes with ``--async-collect``. Reads
+cycle through the GET routes of ``benchmarks.run``. The report holds the
+throughput and latency of every kind of request and is written as JSON to
+``benchmarks/results/``.
+"""
+
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+
+from benchmarks.run import RESULTS_DIR, ROUTES, git_revision, latency
+
+
+class Recorder:
+    """Latencies and status codes of every request, per kind of request."""
+
+    def __init__(self):
+        self.samples = {}
+        self.statuses = {}
+        self.pokemons = 0
+        self._lock = threading.Lock()
+
+    def add(self, kind, seconds, status, pokemons=0):
+        with self._lock:
+            self.samples.setdefault(kind, []).append(seconds)
+            statuses = self.statuses.setdefault(kind, {})
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+            self.pokemons += pokemons
+
+    def report(self, elapsed):
+        with self._lock:
+            return {
+                kind: {
+                    "requests_per_second": round(len(samples) / elapsed, 2),
+                    "statuses": dict(sorted(self.statuses[kind].items())),
+                    **latency(samples),
+                }
+                for kind, samples in sorted(self.samples.items())
+            }
+
+
+def login(client, username, password):
+    """Register ``username`` if needed and return a bearer header for it."""
+    credentials = {"username": username, "password": password}
+    client.post("/auth/register", json=credentials)
+    response = client.post("/auth/login", json=credentials)
+    response.raise_for_status()
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+
+def wait_for_job(client, headers, status_url, poll_interval):
+    while True:
+        job = client.get(status_url, headers=headers).json()
+        if job["status"] in ("finished", "failed"):
+            return job
+        time.sleep(poll_interval)
+
+
+def collect_worker(client, headers, args, recorder, deadline, seed):
+    rng = random.Random(seed)
+    while time.monotonic() < deadline:
+        names = [
+            str(pokemon_id)
+            for pokemon_id in rng.sample(range(1, args.pokemons + 1), args.collect_size)
+        ]
+        body = {"pokemon": names, "force": args.force}
+        started = time.perf_counter()
+        try:
+            if args.async_collect:
+                response = client.post(
+                    "/v1/pokemon/collect", json=body, headers=headers
+                )
+                if response.status_code == 202:
+                    job = wait_for_job(
+                        client, headers, response.json()["status_url"], args.poll
+                    )
+                    status = job["status"]
+                    results = job["results"]
+                else:
+                    status, results = response.status_code, []
+            else:
+                response = client.post(
+                    "/v1/pokemon/collect?sync=true", json=body, headers=headers
+                )
+                status = response.status_code
+                results = response.json().get("results", []) if status == 200 else []
+        except httpx.HTTPError as e:
+            status, results = type(e).__name__, []
+        ingested = sum(result["status"] != "error" for result in results)
+        recorder.add("collect", time.perf_counter() - started, status, ingested)
+
+
+def read_worker(client, headers, recorder, deadline, seed):
+    routes = list(ROUTES.items())
+    random.Random(seed).shuffle(routes)
+    index = 0
+    while time.monotonic() < deadline:
+        name, url = routes[index % len(routes)]
+        index += 1
+        started = time.perf_counter()
+        try:
+            status = client.get(url, headers=headers).status_code
+        except httpx.HTTPError as e:
+            status = type(e).__name__
+        recorder.add(f"read.{name}", time.perf_counter() - started, status)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--app-url", default="http://127.0.0.1:5000")
+    parser.add_argument("--username", default="load-driver")
+    parser.add_argument("--password", default="load-driver")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds.")
+    parser.add_argument("--collect-workers", type=int, default=2)
+    parser.add_argument("--read-workers", type=int, default=8)
+    parser.add_argument(
+        "--pokemons", type=int, default=1025, help="Ids collects draw from."
+    )
+    parser.add_argument("--collect-size", type=int, default=20)
+    parser.add_argument("--force", action="store_true")
+    parser.add_argument("--async-collect", action="store_true")
+    parser.add_argument("--poll", type=float, default=0.2, help="Job poll seconds.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", type=Path, help="Result file to write.")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    started_at = datetime.now(timezone.utc)
+    recorder = Recorder()
+    timeout = httpx.Timeout(300.0, connect=5.0)
+    with httpx.Client(base_url=args.app_url, timeout=timeout) as client:
+        headers = login(client, args.username, args.password)
+        deadline = time.monotonic() + args.duration
+        threads = [
+            threading.Thread(
+                target=collect_worker,
+                args=(client, headers, args, recorder, deadline, args.seed + index),
+            )
+            for index in range(args.collect_workers)
+        ] + [
+            threading.Thread(
+                target=read_worker,
+                args=(client, headers, recorder, deadline, args.seed + index),
+            )
+            for index in range(args.read_workers)
+        ]
+        print(
+            f"Running {args.collect_workers} collect and {args.read_workers} "
+            f"read workers for {args.duration:g}s",
+            file=sys.stderr,
+        )
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+    results = {
+        "started_at": started_at.isoformat(),
+        "revision": git_revision(),
+        "settings": {
+            key: value
+            for key, value in vars(args).items()
+            if key not in ("password", "output")
+        },
+        "elapsed_seconds": round(elapsed, 3),
+        "pokemons_per_second": round(recorder.pokemons / elapsed, 2),
+        "requests": recorder.report(elapsed),
+    }
+    output = args.output or RESULTS_DIR / f"load-{started_at:%Y%m%dT%H%M%SZ}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2) + "\n")
+    print(json.dumps(results, indent=2))
+    print(f"Results written to {output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
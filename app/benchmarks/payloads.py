@@ -0,0 +1,138 @@
+import random
+
+BASE_URL = "https://pokeapi.co/api/v2"
+STAT_NAMES = (
+    "hp",
+    "attack",
+    "defense",
+    "special-attack",
+    "special-defense",
+    "speed",
+)
+MOVE_POOL = 919
+ABILITY_POOL = 307
+TYPE_POOL = 18
+VERSION_GROUPS = ("red-blue", "gold-silver", "ruby-sapphire", "diamond-pearl")
+LEARN_METHODS = ("level-up", "machine", "egg", "tutor")
+
+# (min, max) of each list, close to the spread of the real national dex.
+DEFAULT_PROFILE = {"moves": (1, 120), "abilities": (1, 3), "forms": (1, 3)}
+
+
+def resource(kind, resource_id, name=None):
+    return {
+        "name": name or f"{kind}-{resource_id}",
+        "url": f"{BASE_URL}/{kind}/{resource_id}/",
+    }
+
+
+def make_move(move_id, rng):
+    details = []
+    for group in rng.sample(VERSION_GROUPS, rng.randint(1, 3)):
+        method = rng.choice(LEARN_METHODS)
+        details.append(
+            {
+                "level_learned_at": rng.randint(0, 60),
+                "move_learn_method": resource(
+                    "move-learn-method", LEARN_METHODS.index(method) + 1, method
+                ),
+                "version_group": resource(
+                    "version-group", VERSION_GROUPS.index(group) + 1, group
+                ),
+            }
+        )
+    return {"move": resource("move", move_id), "version_group_details": details}
+
+
+def make_payload(pokemon_id, n_moves=20, n_abilities=2, n_forms=1, rng=None):
+    """Synthetic ``/pokemon/{id}`` payload with the shape the sanitizers read.
+
+    Moves, abilities and types are drawn from pools the size of the real API
+    so reference rows are shared between pokemons as they are in production.
+    """
+    rng = rng or random.Random(pokemon_id)
+    n_types = rng.choice((1, 2))
+    return {
+        "abilities": [
+            {
+                "ability": resource("ability", ability_id),
+                "is_hidden": slot == n_abilities,
+                "slot": slot,
+            }
+            for slot, ability_id in enumerate(
+                rng.sample(range(1, ABILITY_POOL + 1), n_abilities), start=1
+            )
+        ],
+        "base_experience": rng.randint(30, 300),
+        "cries": {
+            "latest": f"https://cries.example/latest/{pokemon_id}.ogg",
+            "legacy": (
+                None
+                if pokemon_id % 3 == 0
+                else f"https://cries.example/legacy/{pokemon_id}.ogg"
+            ),
+        },
+        "forms": [
+            resource(
+                "pokemon-form", pokemon_id * 10 + index, f"poke-{pokemon_id}-{index}"
+            )
+            for index in range(n_forms)
+        ],
+        "game_indices": [
+            {"game_index": pokemon_id, "version": resource("version", 1, "red")}
+        ],
+        "height": rng.randint(1, 30),
+        "held_items": [],
+        "id": pokemon_id,
+        "is_default": True,
+        "location_area_encounters": f"{BASE_URL}/pokemon/{pokemon_id}/encounters",
+        "moves": [
+            make_move(move_id, rng)
+            for move_id in rng.sample(range(1, MOVE_POOL + 1), n_moves)
+        ],
+        "name": f"poke-{pokemon_id}",
+        "order": pokemon_id,
+        "past_abilities": [],
+        "past_types": [],
+        "species": resource("pokemon-species", pokemon_id, f"species-{pokemon_id}"),
+        "sprites": {
+            "front_default": f"https://sprites.example/{pokemon_id}.png",
+            "back_default": None,
+            "other": {
+                "home": {
+                    "front_default": f"https://sprites.example/home/{pokemon_id}.png"
+                }
+            },
+        },
+        "stats": [
+            {
+                "base_stat": rng.randint(10, 200),
+                "effort": rng.randint(0, 3),
+                "stat": resource("stat", stat_id, name),
+            }
+            for stat_id, name in enumerate(STAT_NAMES, start=1)
+        ],
+        "types": [
+            {"slot": slot, "type": resource("type", type_id)}
+            for slot, type_id in enumerate(
+                rng.sample(range(1, TYPE_POOL + 1), n_types), start=1
+            )
+        ],
+        "weight": rng.randint(1, 1000),
+    }
+
+
+def make_payloads(count, seed=0, profile=None, first_id=1):
+    """``count`` payloads with move/ability/form counts drawn from ``profile``."""
+    profile = {**DEFAULT_PROFILE, **(profile or {})}
+    rng = random.Random(seed)
+    return [
+        make_payload(
+            pokemon_id,
+            n_moves=rng.randint(*profile["moves"]),
+            n_abilities=rng.randint(*profile["abilities"]),
+            n_forms=rng.randint(*profile["forms"]),
+            rng=rng,
+        )
+        for pokemon_id in range(first_id, first_id + count)
+    ]
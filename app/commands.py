@@ -0,0 +1,192 @@
+import time
+
+import click
+from commons import config
+from libs import pokemon_api_client
+from libs import pokemon_db_client
+from libs import pokemon_import
+from libs import pokemon_ingest
+from libs import pokemon_parser
+from libs.models import aggregates
+from libs.models import pokemon
+from libs.models import users
+from libs.response_cache import response_cache
+from libs.models.jobs import IngestCheckpoint, utcnow
+from loguru import logger as log
+from sqlalchemy import delete
+from sqlalchemy.exc import SQLAlchemyError
+from sqlmodel import select
+
+
+@click.command("ingest-dex")
+@click.option("--name", default="national-dex", help="Checkpoint name.")
+@click.option("--page-size", default=100, show_default=True, type=int)
+@click.option(
+    "--concurrency", default=None, type=int, help="Defaults to FETCH_CONCURRENCY."
+)
+@click.option(
+    "--batch-size", default=None, type=int, help="Defaults to INGEST_BATCH_SIZE."
+)
+@click.option("--limit", default=None, type=int, help="Stop after this many pokemons.")
+@click.option(
+    "--force", is_flag=True, help="Rewrite pokemons whose payload did not change."
+)
+@click.option(
+    "--restart",
+    is_flag=True,
+    help="Ignore the checkpoint and start from the first pokemon.",
+)
+def ingest_dex(name, page_size, concurrency, batch_size, limit, force, restart):
+    """Ingest every pokemon listed by the API, resuming from the last checkpoint."""
+    with users.get_session() as session:
+        checkpoint = session.get(IngestCheckpoint, name)
+        if checkpoint is None or restart:
+            checkpoint = session.merge(IngestCheckpoint(name=name))
+            session.commit()
+        elif checkpoint.status == "finished":
+            click.echo(
+                f"Checkpoint {name} already finished, use --restart to ingest again"
+            )
+            return
+        offset, failed = checkpoint.offset, list(checkpoint.failed)
+    click.echo(f"Ingesting from offset {offset}")
+
+    ingested = 0
+    with pokemon_api_client.PokemonAPIClient() as api:
+        while limit is None or ingested < limit:
+            size = page_size if limit is None else min(page_size, limit - ingested)
+            page = api.list_pokemons(offset=offset, limit=size)
+            names = [result["name"] for result in page["results"]]
+            if not names:
+                break
+            for status in pokemon_ingest.ingest_pokemons(
+                api, names, concurrency, batch_size, force
+            ):
+                if status["status"] == "error":
+                    failed.append(status["pokemon"])
+            offset += len(names)
+            ingested += len(names)
+            finished = page.get("next") is None
+            with users.get_session() as session:
+                checkpoint = session.get(IngestCheckpoint, name)
+                checkpoint.offset = offset
+                checkpoint.total = page.get("count")
+                checkpoint.failed = failed
+                checkpoint.status = "finished" if finished else "running"
+                checkpoint.updated_at = utcnow()
+                session.add(checkpoint)
+                session.commit()
+            log.info(f"Checkpoint {name} at {offset}/{page.get('count')}")
+            click.echo(f"{offset}/{page.get('count')} pokemons, {len(failed)} failed")
+            if finished:
+                break
+    if failed:
+        click.echo(f"Failed pokemons: {', '.join(failed)}")
+
+
+@click.command("import-dump")
+@click.argument(
+    "paths", nargs=-1, required=True, type=click.Path(exists=True, dir_okay=False)
+)
+@click.option(
+    "--batch-size", default=None, type=int, help="Defaults to INGEST_BATCH_SIZE."
+)
+@click.option(
+    "--mode",
+    default=None,
+    type=click.Choice([*pokemon_parser.PARSER_MODES, "batch"]),
+    help="Parser mode, defaults to PARSER_MODE.",
+)
+@click.option(
+    "--force", is_flag=True, help="Rewrite pokemons whose payload did not change."
+)
+@click.option(
+    "--bulk",
+    is_flag=True,
+    help="Initial load: COPY through staging tables on PostgreSQL, executemany "
+    "on SQLite, in one transaction.",
+)
+@click.option(
+    "--append",
+    is_flag=True,
+    help="Allow --bulk on a database that already has pokemons.",
+)
+def import_dump(paths, batch_size, mode, force, bulk, append):
+    """Import PokeAPI pokemon payloads from NDJSON dumps (.ndjson, .gz or .zst)."""
+    if bulk and not append:
+        with users.get_session() as session:
+            if session.exec(select(pokemon.Pokemon.id).limit(1)).first() is not None:
+                raise click.ClickException(
+                    "--bulk is meant for empty databases and does not remove "
+                    "stale links; use --append to load anyway"
+                )
+    if bulk:
+        statuses = pokemon_import.bulk_import_dumps(paths, batch_size, mode)
+    else:
+        statuses = pokemon_import.import_dumps(paths, batch_size, force, mode)
+    counts = {"ingested": 0, "unchanged": 0, "error": 0}
+    failed = []
+    started = time.perf_counter()
+    try:
+        for status in statuses:
+            counts[status["status"]] += 1
+            if status["status"] == "error":
+                failed.append(status["pokemon"])
+            total = sum(counts.values())
+            if total % 1000 == 0:
+                click.echo(f"{total} pokemons read")
+    except (OSError, RuntimeError, SQLAlchemyError) as e:
+        raise click.ClickException(str(e))
+    elapsed = time.perf_counter() - started
+    total = sum(counts.values())
+    click.echo(
+        f"{total} pokemons in {elapsed:.1f}s ({total / max(elapsed, 1e-9):.0f}/s): "
+        + ", ".join(f"{count} {status}" for status, count in counts.items())
+    )
+    if failed:
+        click.echo(f"Failed pokemons: {', '.join(failed)}")
+
+
+@click.command("check-aggregates")
+@click.option("--fix", is_flag=True, help="Rewrite the aggregates that differ.")
+def check_aggregates(fix):
+    """Recompute the type and stat aggregates and compare them with the stored ones."""
+    checks = [
+        (aggregates.TypeCount, "type_id", "type_count_rows"),
+        (aggregates.StatAggregate, "stat_id", "stat_aggregate_rows"),
+    ]
+    mismatches = 0
+    with users.get_session() as session:
+        db_client = pokemon_db_client.PokemonClientDB(session=session)
+        for model, key, compute in checks:
+            stored = {
+                row[key]: dict(row)
+                for row in session.execute(select(model.__table__)).mappings()
+            }
+            for expected in getattr(db_client, compute)():
+                actual = stored.pop(expected[key], None)
+                if actual != expected:
+                    mismatches += 1
+                    click.echo(
+                        f"{model.__tablename__} {key}={expected[key]}: "
+                        f"stored {actual}, expected {expected}"
+                    )
+            for orphan in stored:
+                mismatches += 1
+                click.echo(f"{model.__tablename__} {key}={orphan}: no such row")
+        if mismatches and fix:
+            session.execute(delete(aggregates.TypeCount))
+            session.execute(delete(aggregates.StatAggregate))
+            db_client.refresh_aggregates()
+            session.commit()
+            response_cache.invalidate(
+                [
+                    aggregates.TypeCount.__tablename__,
+                    aggregates.StatAggregate.__tablename__,
+                ]
+            )
+            click.echo(f"Fixed {mismatches} aggregate rows")
+        elif mismatches:
+            raise click.ClickException(f"{mismatches} aggregate rows differ")
+        else:
+            click.echo("Aggregates are consistent")
@@ -1,7 +1,45 @@
 from decouple import config
 
 DB_URI = config("SQLALCHEMY_DATABASE_URI")
+DB_ECHO = config("DB_ECHO", default=False, cast=bool)
+DB_POOL_SIZE = config("DB_POOL_SIZE", default=5, cast=int)
+DB_MAX_OVERFLOW = config("DB_MAX_OVERFLOW", default=10, cast=int)
+DB_POOL_TIMEOUT = config("DB_POOL_TIMEOUT", default=30.0, cast=float)
+DB_POOL_RECYCLE = config("DB_POOL_RECYCLE", default=1800, cast=int)
+DB_POOL_PRE_PING = config("DB_POOL_PRE_PING", default=True, cast=bool)
 API_POKEMON = config("POKEMON_API_URL")
+API_TIMEOUT = config("POKEMON_API_TIMEOUT", default=10.0, cast=float)
+API_CONNECT_TIMEOUT = config("POKEMON_API_CONNECT_TIMEOUT", default=5.0, cast=float)
+API_MAX_CONNECTIONS = config("POKEMON_API_MAX_CONNECTIONS", default=20, cast=int)
+API_HTTP2 = config("POKEMON_API_HTTP2", default=True, cast=bool)
+API_MAX_RETRIES = config("POKEMON_API_MAX_RETRIES", default=3, cast=int)
+API_BACKOFF_FACTOR = config("POKEMON_API_BACKOFF_FACTOR", default=0.5, cast=float)
+API_BACKOFF_MAX = config("POKEMON_API_BACKOFF_MAX", default=30.0, cast=float)
+API_CACHE_DIR = config("POKEMON_API_CACHE_DIR", default="")
+API_CACHE_TTL = config("POKEMON_API_CACHE_TTL", default=86400, cast=int)
+FETCH_CONCURRENCY = config("FETCH_CONCURRENCY", default=8, cast=int)
+PARSER_MODE = config("PARSER_MODE", default="dict")
+INGEST_BATCH_SIZE = config("INGEST_BATCH_SIZE", default=50, cast=int)
+PARSE_WORKERS = config("PARSE_WORKERS", default=0, cast=int)
+STREAM_BATCH_SIZE = config("STREAM_BATCH_SIZE", default=500, cast=int)
+STATS_SNAPSHOT_TTL = config("STATS_SNAPSHOT_TTL", default=300.0, cast=float)
+RESPONSE_CACHE_TTL = config("RESPONSE_CACHE_TTL", default=60.0, cast=float)
+RESPONSE_CACHE_SIZE = config("RESPONSE_CACHE_SIZE", default=1024, cast=int)
+RESPONSE_CACHE_DIR = config("RESPONSE_CACHE_DIR", default="")
+INGEST_WORKERS = config("INGEST_WORKERS", default=2, cast=int)
+INGEST_POLL_INTERVAL = config("INGEST_POLL_INTERVAL", default=2.0, cast=float)
+INGEST_PROGRESS_INTERVAL = config("INGEST_PROGRESS_INTERVAL", default=1.0, cast=float)
+INGEST_JOB_STALE_SECONDS = config("INGEST_JOB_STALE_SECONDS", default=600, cast=int)
+INGEST_JOB_HEARTBEAT_INTERVAL = config(
+    "INGEST_JOB_HEARTBEAT_INTERVAL", default=30.0, cast=float
+)
+REFERENCE_CACHE_SIZE = config("REFERENCE_CACHE_SIZE", default=50000, cast=int)
+REFERENCE_CACHE_WARM = config("REFERENCE_CACHE_WARM", default=False, cast=bool)
+PASSWORD_HASH_ROUNDS = config("PASSWORD_HASH_ROUNDS", default=29000, cast=int)
+AUTH_CACHE_SIZE = config("AUTH_CACHE_SIZE", default=1024, cast=int)
+AUTH_CACHE_TTL = config("AUTH_CACHE_TTL", default=300.0, cast=float)
+LOGIN_RATE_LIMIT = config("LOGIN_RATE_LIMIT", default=10, cast=int)
+LOGIN_RATE_WINDOW = config("LOGIN_RATE_WINDOW", default=60.0, cast=float)
 
 
 class Config:
@@ -0,0 +1,106 @@
+import hashlib
+import hmac
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+
+from commons import config
+
+
+class CredentialCache:
+    """Bounded LRU of recently verified logins, so repeats skip PBKDF2.
+
+    Entries are keyed by an HMAC (with a per-process random key) of the
+    username, the submitted password and the stored password hash. Plain
+    passwords are never kept, and changing or rehashing a password makes the
+    old entry unreachable.
+    """
+
+    def __init__(self, max_size=None, ttl=None):
+        self.max_size = config.AUTH_CACHE_SIZE if max_size is None else max_size
+        self.ttl = config.AUTH_CACHE_TTL if ttl is None else ttl
+        self._key = os.urandom(32)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _digest(self, username, password, hashed_password):
+        message = "\0".join((username, password, hashed_password)).encode()
+        return hmac.new(self._key, message, hashlib.sha256).digest()
+
+    def is_verified(self, username, password, hashed_password):
+        if self.max_size <= 0 or self.ttl <= 0:
+            return False
+        digest = self._digest(username, password, hashed_password)
+        with self._lock:
+            verified_at = self._entries.get(digest)
+            if verified_at is None:
+                return False
+            if time.monotonic() - verified_at >= self.ttl:
+                del self._entries[digest]
+                return False
+            self._entries.move_to_end(digest)
+            return True
+
+    def add(self, username, password, hashed_password):
+        if self.max_size <= 0 or self.ttl <= 0:
+            return
+        digest = self._digest(username, password, hashed_password)
+        with self._lock:
+            self._entries[digest] = time.monotonic()
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+
+class LoginRateLimiter:
+    """Sliding window of failed login attempts per key, e.g. ``(username, ip)``.
+
+    Only failures count, and a successful login clears its key, so a user
+    who logs in often is never throttled.
+    """
+
+    def __init__(self, attempts=None, window=None, max_keys=10000):
+        self.attempts = config.LOGIN_RATE_LIMIT if attempts is None else attempts
+        self.window = config.LOGIN_RATE_WINDOW if window is None else window
+        self.max_keys = max_keys
+        self._failures = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _recent(self, key, now):
+        failures = self._failures.get(key)
+        while failures and now - failures[0] >= self.window:
+            failures.popleft()
+        return failures
+
+    def retry_after(self, key):
+        """Seconds to wait before ``key`` may try again, 0 if it is under the limit."""
+        if self.attempts <= 0:
+            return 0
+        now = time.monotonic()
+        with self._lock:
+            failures = self._recent(key, now)
+            if failures and len(failures) >= self.attempts:
+                return self.window - (now - failures[0])
+        return 0
+
+    def fail(self, key):
+        """Record a failed attempt of ``key``."""
+        if self.attempts <= 0:
+            return
+        now = time.monotonic()
+        with self._lock:
+            self._recent(key, now)
+            self._failures.setdefault(key, deque()).append(now)
+            self._failures.move_to_end(key)
+            while len(self._failures) > self.max_keys:
+                self._failures.popitem(last=False)
+
+    def reset(self, key):
+        """Forget the failures of ``key`` after a successful login."""
+        with self._lock:
+            self._failures.pop(key, None)
+
+
+credential_cache = CredentialCache()
+login_rate_limiter = LoginRateLimiter()
@@ -0,0 +1,253 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+from sqlalchemy import event
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, 30.0)
+STATEMENT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 500, 1000)
+
+
+def format_labels(labels):
+    if not labels:
+        return ""
+    pairs = ",".join(f'{name}="{value}"' for name, value in labels)
+    return f"{{{pairs}}}"
+
+
+class Gauge:
+    """Single value; ``read`` computes it at scrape time instead of ``inc``/``dec``."""
+
+    def __init__(self, name, help_text, read=None):
+        self.name = name
+        self.help_text = help_text
+        self.read = read
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount=1):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount=1):
+        self.inc(-amount)
+
+    def render(self):
+        value = self.read() if self.read else self.value
+        return [
+            f"# HELP {self.name} {self.help_text}",
+            f"# TYPE {self.name} gauge",
+            f"{self.name} {value}",
+        ]
+
+
+class Histogram:
+    """Histogram in the Prometheus text format, one series per label set."""
+
+    def __init__(self, name, help_text, buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = tuple(buckets)
+        self._series = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._series.setdefault(
+                key, {"buckets": [0] * len(self.buckets), "count": 0, "sum": 0.0}
+            )
+            index = bisect.bisect_left(self.buckets, value)
+            if index < len(self.buckets):
+                series["buckets"][index] += 1
+            series["count"] += 1
+            series["sum"] += value
+
+    def time(self, **labels):
+        return Timer(self, labels)
+
+    def render(self):
+        lines = [
+            f"# HELP {self.name} {self.help_text}",
+            f"# TYPE {self.name} histogram",
+        ]
+        with self._lock:
+            series = {key: dict(value) for key, value in self._series.items()}
+        for key, value in sorted(series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, value["buckets"]):
+                cumulative += count
+                labels = format_labels(key + (("le", f"{bound:g}"),))
+                lines.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = format_labels(key + (("le", "+Inf"),))
+            lines.append(f"{self.name}_bucket{labels} {value['count']}")
+            lines.append(f"{self.name}_sum{format_labels(key)} {value['sum']}")
+            lines.append(f"{self.name}_count{format_labels(key)} {value['count']}")
+        return lines
+
+
+class Timer:
+    """Context manager observing the seconds spent in its block."""
+
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.histogram.observe(time.perf_counter() - self.started, **self.labels)
+
+
+class Registry:
+    def __init__(self):
+        self.metrics = {}
+
+    def register(self, metric):
+        return self.metrics.setdefault(metric.name, metric)
+
+    def render(self):
+        lines = []
+        for metric in self.metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = Registry()
+
+pool_checkout_wait = registry.register(
+    Histogram(
+        "db_pool_checkout_wait_seconds",
+        "Seconds spent waiting for a connection from the pool.",
+    )
+)
+pool_in_use = registry.register(
+    Gauge("db_pool_connections_in_use", "Connections checked out of the pool.")
+)
+
+ingest_stage_seconds = registry.register(
+    Histogram("ingest_stage_seconds", "Seconds spent in each collect pipeline stage.")
+)
+ingest_stage_statements = registry.register(
+    Histogram(
+        "ingest_stage_statements",
+        "Database statements run by each collect pipeline stage.",
+        buckets=STATEMENT_BUCKETS,
+    )
+)
+
+# Per-thread statement counter, and the StageTimings and span list being
+# collected, if any.
+_local = threading.local()
+
+
+class StageTimings:
+    """Calls, seconds and database statements of every stage of one request."""
+
+    def __init__(self):
+        self.stages = {}
+        self._lock = threading.Lock()
+
+    def add(self, stage, seconds, statements):
+        with self._lock:
+            totals = self.stages.setdefault(
+                stage, {"calls": 0, "seconds": 0.0, "statements": 0}
+            )
+            totals["calls"] += 1
+            totals["seconds"] += seconds
+            totals["statements"] += statements
+
+    def summary(self):
+        with self._lock:
+            return {
+                stage: {**totals, "seconds": round(totals["seconds"], 4)}
+                for stage, totals in sorted(self.stages.items())
+            }
+
+
+@contextmanager
+def collect_timings(timings=None):
+    """Collect the spans run by this thread into ``timings`` (a new ``StageTimings``)."""
+    previous = getattr(_local, "timings", None)
+    timings = _local.timings = timings or StageTimings()
+    try:
+        yield timings
+    finally:
+        _local.timings = previous
+
+
+@contextmanager
+def collect_spans():
+    """Collect the spans run by this thread as ``(stage, seconds, statements)`` tuples.
+
+    Used in worker processes, whose histograms are never scraped: the parent
+    replays the list with ``record``.
+    """
+    previous = getattr(_local, "spans", None)
+    spans = _local.spans = []
+    try:
+        yield spans
+    finally:
+        _local.spans = previous
+
+
+def record(stage, seconds, statements):
+    """Feed one finished span to the histograms and to this thread's collectors."""
+    ingest_stage_seconds.observe(seconds, stage=stage)
+    ingest_stage_statements.observe(statements, stage=stage)
+    timings = getattr(_local, "timings", None)
+    if timings is not None:
+        timings.add(stage, seconds, statements)
+    spans = getattr(_local, "spans", None)
+    if spans is not None:
+        spans.append((stage, seconds, statements))
+
+
+@contextmanager
+def span(stage):
+    """Time a pipeline stage and count the statements it runs in this thread.
+
+    Every span feeds the Prometheus histograms; inside ``collect_timings``
+    it is also added to that request's summary. Nested spans are counted in
+    both the inner and the outer stage.
+    """
+    statements = getattr(_local, "statements", 0)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(
+            stage,
+            time.perf_counter() - started,
+            getattr(_local, "statements", 0) - statements,
+        )
+
+
+def count_statement(*args):
+    _local.statements = getattr(_local, "statements", 0) + 1
+
+
+def instrument_engine(engine):
+    """Record pool checkout wait time, connections in use and statements for ``engine``."""
+    pool = engine.pool
+    connect = pool.connect
+
+    def timed_connect():
+        with pool_checkout_wait.time():
+            return connect()
+
+    pool.connect = timed_connect
+    event.listen(engine, "before_cursor_execute", count_statement)
+    event.listen(pool, "checkout", lambda *args: pool_in_use.inc())
+    event.listen(pool, "checkin", lambda *args: pool_in_use.dec())
+    registry.register(
+        Gauge(
+            "db_pool_size",
+            "Connections kept open by the pool.",
+            read=lambda: pool.size() if hasattr(pool, "size") else 0,
+        )
+    )
+    return engine
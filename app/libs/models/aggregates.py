@@ -0,0 +1,23 @@
+from typing import Optional
+from sqlmodel import SQLModel, Field
+
+
+class TypeCount(SQLModel, table=True):
+    """Number of pokemons of each type, kept up to date by the ingest."""
+
+    __tablename__ = "type_count"
+    type_id: int = Field(foreign_key="type.id", primary_key=True)
+    type_name: str = Field(index=True)
+    total_pokemons: int = 0
+
+
+class StatAggregate(SQLModel, table=True):
+    """Sum, count, min and max of the base value of each stat."""
+
+    __tablename__ = "stat_aggregate"
+    stat_id: int = Field(foreign_key="stat.id", primary_key=True)
+    stat_name: str = Field(index=True)
+    total: int = 0
+    count: int = 0
+    min: Optional[int] = None
+    max: Optional[int] = None
@@ -0,0 +1,64 @@
+from datetime import datetime, timezone
+from typing import Optional, List
+from sqlmodel import SQLModel, Field, Column, JSON, DateTime
+
+
+def utcnow():
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+class IngestJob(SQLModel, table=True):
+    __tablename__ = "ingest_job"
+    id: str = Field(primary_key=True)
+    status: str = Field(
+        default="queued", index=True
+    )  # queued, running, finished, failed
+    pokemon: List[str] = Field(default_factory=list, sa_column=Column(JSON))
+    concurrency: Optional[int] = None
+    force: bool = False
+    requested_by: Optional[str] = None
+    worker: Optional[str] = None
+    total: int = 0
+    processed: int = 0
+    results: List[dict] = Field(default_factory=list, sa_column=Column(JSON))
+    cache: Optional[dict] = Field(default=None, sa_column=Column(JSON))
+    timings: Optional[dict] = Field(default=None, sa_column=Column(JSON))
+    error: Optional[str] = None
+    # Naive UTC timestamps, stored the same way on every backend.
+    created_at: datetime = Field(default_factory=utcnow, sa_type=DateTime, index=True)
+    started_at: Optional[datetime] = Field(default=None, sa_type=DateTime)
+    finished_at: Optional[datetime] = Field(default=None, sa_type=DateTime)
+    updated_at: datetime = Field(default_factory=utcnow, sa_type=DateTime)
+
+    def to_dict(self):
+        queued_seconds = run_seconds = None
+        if self.started_at:
+            queued_seconds = (self.started_at - self.created_at).total_seconds()
+            run_seconds = (
+                (self.finished_at or utcnow()) - self.started_at
+            ).total_seconds()
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "total": self.total,
+            "processed": self.processed,
+            "results": self.results,
+            "cache": self.cache,
+            "timings": self.timings,
+            "error": self.error,
+            "created_at": self.created_at.isoformat(),
+            "started_at": self.started_at and self.started_at.isoformat(),
+            "finished_at": self.finished_at and self.finished_at.isoformat(),
+            "queued_seconds": queued_seconds,
+            "run_seconds": run_seconds,
+        }
+
+
+class IngestCheckpoint(SQLModel, table=True):
+    __tablename__ = "ingest_checkpoint"
+    name: str = Field(primary_key=True)
+    offset: int = 0
+    total: Optional[int] = None
+    status: str = "running"  # running, finished
+    failed: List[str] = Field(default_factory=list, sa_column=Column(JSON))
+    updated_at: datetime = Field(default_factory=utcnow, sa_type=DateTime)
@@ -1,6 +1,6 @@
 from typing import Optional, List
 from sqlmodel import SQLModel, Field, Relationship, select
-from sqlalchemy import and_
+from sqlalchemy import Index, and_
 
 
 class Species(SQLModel, table=True):
@@ -13,20 +13,24 @@ class Species(SQLModel, table=True):
 
 class PokemonForm(SQLModel, table=True):
     pokemon_id: int = Field(foreign_key="pokemon.id", primary_key=True)
-    form_id: int = Field(foreign_key="form.id", primary_key=True)
+    form_id: int = Field(foreign_key="form.id", primary_key=True, index=True)
 
 
 class Pokemon(SQLModel, table=True):
     id: int = Field(primary_key=True)  # Id do Pokémon
     name: str
-    base_experience: Optional[int] = None
+    base_experience: Optional[int] = Field(default=None, index=True)
     height: Optional[int] = None
     weight: Optional[int] = None
     order: Optional[int] = None
     is_default: Optional[bool] = None
     location_area_encounters: Optional[str] = None
+    # sha256 of the raw API payload, used to skip unchanged re-ingests.
+    payload_hash: Optional[str] = None
 
-    species_id: Optional[int] = Field(default=None, foreign_key="species.id")
+    species_id: Optional[int] = Field(
+        default=None, foreign_key="species.id", index=True
+    )
 
     species: Optional[Species] = Relationship(back_populates="pokemons")
     abilities: List["PokemonAbility"] = Relationship(back_populates="pokemon")
@@ -60,7 +64,7 @@ class Ability(SQLModel, table=True):
 
 class PokemonAbility(SQLModel, table=True):
     pokemon_id: int = Field(foreign_key="pokemon.id", primary_key=True)
-    ability_id: int = Field(foreign_key="ability.id", primary_key=True)
+    ability_id: int = Field(foreign_key="ability.id", primary_key=True, index=True)
     is_hidden: Optional[bool] = None
     slot: Optional[int] = None
 
@@ -77,14 +81,14 @@ class Cries(SQLModel, table=True):
 
 class PokemonCry(SQLModel, table=True):
     pokemon_id: int = Field(foreign_key="pokemon.id", primary_key=True)
-    cry_id: int = Field(foreign_key="cries.id", primary_key=True)
+    cry_id: int = Field(foreign_key="cries.id", primary_key=True, index=True)
     pokemon: Optional[Pokemon] = Relationship(back_populates="cries")
     cry: Optional[Cries] = Relationship(back_populates="pokemon_cries")
 
 
 class Type(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
-    name: str
+    name: str = Field(index=True)
     url: Optional[str] = None
 
     pokemon_types: List["PokemonType"] = Relationship(back_populates="type")
@@ -92,7 +96,7 @@ class Type(SQLModel, table=True):
 
 class PokemonType(SQLModel, table=True):
     pokemon_id: int = Field(foreign_key="pokemon.id", primary_key=True)
-    type_id: int = Field(foreign_key="type.id", primary_key=True)
+    type_id: int = Field(foreign_key="type.id", primary_key=True, index=True)
     slot: Optional[int] = None
 
     pokemon: Optional[Pokemon] = Relationship(back_populates="types")
@@ -101,13 +105,18 @@ class PokemonType(SQLModel, table=True):
 
 class Stat(SQLModel, table=True):
     id: Optional[int] = Field(default=None, primary_key=True)
-    name: str
+    name: str = Field(index=True)
     url: Optional[str] = None
 
     pokemon_stats: List["PokemonStat"] = Relationship(back_populates="stat")
 
 
 class PokemonStat(SQLModel, table=True):
+    # Covers the per-stat sum/count/min/max without reading the table.
+    __table_args__ = (
+        Index("ix_pokemonstat_stat_id_base_stat", "stat_id", "base_stat"),
+    )
+
     pokemon_id: int = Field(foreign_key="pokemon.id", primary_key=True)
     stat_id: int = Field(foreign_key="stat.id", primary_key=True)
     base_stat: Optional[int] = None
@@ -128,7 +137,7 @@ class Move(SQLModel, table=True):
 class PokemonMove(SQLModel, table=True):
     __tablename__ = "pokemon_move"
     pokemon_id: int = Field(foreign_key="pokemon.id", primary_key=True)
-    move_id: int = Field(foreign_key="move.id", primary_key=True)
+    move_id: int = Field(foreign_key="move.id", primary_key=True, index=True)
 
     pokemon: Optional[Pokemon] = Relationship(back_populates="moves")
     move: Optional[Move] = Relationship(back_populates="pokemon_associations")
@@ -1,9 +1,18 @@
+import threading
 from sqlmodel import SQLModel, Field, Session, create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import scoped_session, sessionmaker
+from flask.globals import app_ctx
 from passlib.hash import pbkdf2_sha256
 from contextlib import contextmanager
 from commons import config
+from libs import metrics
 from pydantic import root_validator
 import libs.models.pokemon
+import libs.models.jobs
+import libs.models.aggregates
+
+password_hasher = pbkdf2_sha256.using(rounds=config.PASSWORD_HASH_ROUNDS)
 
 
 class User(SQLModel, table=True):
@@ -12,10 +21,50 @@ class User(SQLModel, table=True):
     hashed_password: str = Field(alias="password")
 
     def check_password(self, plain_password: str) -> bool:
-        return pbkdf2_sha256.verify(plain_password, self.hashed_password)
+        return password_hasher.verify(plain_password, self.hashed_password)
+
+    def needs_rehash(self) -> bool:
+        return password_hasher.needs_update(self.hashed_password)
+
+
+def engine_options(uri):
+    """Keyword arguments for ``create_engine`` built from the DB_* settings."""
+    options = {
+        "echo": config.DB_ECHO,
+        "pool_pre_ping": config.DB_POOL_PRE_PING,
+        "pool_recycle": config.DB_POOL_RECYCLE,
+    }
+    url = make_url(uri)
+    # In-memory SQLite uses a single-connection pool without these settings.
+    if url.get_backend_name() != "sqlite" or url.database not in (None, "", ":memory:"):
+        options["pool_size"] = config.DB_POOL_SIZE
+        options["max_overflow"] = config.DB_MAX_OVERFLOW
+        options["pool_timeout"] = config.DB_POOL_TIMEOUT
+    return options
+
+
+engine = create_engine(
+    config.Config.SQLALCHEMY_DATABASE_URI,
+    **engine_options(config.Config.SQLALCHEMY_DATABASE_URI),
+)
+metrics.instrument_engine(engine)
 
 
-engine = create_engine(config.Config.SQLALCHEMY_DATABASE_URI, echo=True)
+def session_scope():
+    """One session per Flask app context (i.e. per request), else per thread."""
+    if app_ctx:
+        return id(app_ctx._get_current_object())
+    return threading.get_ident()
+
+
+scoped = scoped_session(
+    sessionmaker(bind=engine, class_=Session), scopefunc=session_scope
+)
+
+
+def remove_session(exception=None):
+    """Close the app context session; registered as a Flask teardown."""
+    scoped.remove()
 
 
 def create_table():
@@ -24,5 +73,19 @@ def create_table():
 
 @contextmanager
 def get_session():
+    """Session for the current request, or a short-lived one outside Flask.
+
+    Inside an app context every caller shares the request session, which is
+    closed by ``remove_session`` at teardown. Background workers and CLI
+    code get their own session, closed on exit.
+    """
+    if app_ctx:
+        session = scoped()
+        try:
+            yield session
+        except Exception:
+            session.rollback()
+            raise
+        return
     with Session(engine) as session:
         yield session
@@ -0,0 +1,138 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from loguru import logger as log
+
+
+@dataclass
+class CacheEntry:
+    key: str
+    digest: str
+    fetched_at: float
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+
+    def is_fresh(self, ttl):
+        return ttl > 0 and time.time() - self.fetched_at < ttl
+
+    def validators(self):
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class PayloadCache:
+    """Content-addressed on-disk cache of raw Pokemon API responses.
+
+    Bodies are stored once under ``blobs/`` by their sha256 digest, and every
+    lookup key (pokemon name or id) gets a small index file under ``keys/``
+    pointing at the blob together with the HTTP validators of the response.
+    A refetch with a new body leaves the old blob unreferenced;
+    ``collect_garbage`` removes such blobs.
+    """
+
+    def __init__(self, directory, ttl=0):
+        self.directory = Path(directory)
+        self.ttl = ttl
+        # Keys repointed to a new blob since the last garbage collection.
+        self.replaced = 0
+        (self.directory / "keys").mkdir(parents=True, exist_ok=True)
+        (self.directory / "blobs").mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def normalize_key(key):
+        return str(key).strip().lower()
+
+    def _key_path(self, key):
+        name = hashlib.sha256(self.normalize_key(key).encode()).hexdigest()
+        return self.directory / "keys" / f"{name}.json"
+
+    def _blob_path(self, digest):
+        return self.directory / "blobs" / digest[:2] / f"{digest}.json"
+
+    def _write_atomic(self, path, data):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                tmp.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def get(self, key):
+        try:
+            meta = json.loads(self._key_path(key).read_text())
+        except (OSError, ValueError):
+            return None
+        entry = CacheEntry(**meta)
+        if not self._blob_path(entry.digest).exists():
+            return None
+        return entry
+
+    def load(self, entry):
+        return json.loads(self._blob_path(entry.digest).read_bytes())
+
+    def put(self, keys, body, etag=None, last_modified=None):
+        digest = hashlib.sha256(body).hexdigest()
+        blob_path = self._blob_path(digest)
+        if not blob_path.exists():
+            self._write_atomic(blob_path, body)
+        fetched_at = time.time()
+        for key in keys:
+            previous = self.get(key)
+            if previous is not None and previous.digest != digest:
+                self.replaced += 1
+            entry = CacheEntry(
+                key=self.normalize_key(key),
+                digest=digest,
+                fetched_at=fetched_at,
+                etag=etag,
+                last_modified=last_modified,
+            )
+            self._write_atomic(self._key_path(key), json.dumps(entry.__dict__).encode())
+        log.debug(f"Cached payload {digest} for {keys}")
+        return digest
+
+    def touch(self, entry):
+        entry.fetched_at = time.time()
+        self._write_atomic(
+            self._key_path(entry.key), json.dumps(entry.__dict__).encode()
+        )
+        return entry
+
+    def collect_garbage(self, grace=60):
+        """Delete blobs no key points at; return how many were removed.
+
+        Blobs younger than ``grace`` seconds are kept, since another process
+        may have written one and not yet its key files.
+        """
+        referenced = set()
+        for path in (self.directory / "keys").glob("*.json"):
+            try:
+                referenced.add(json.loads(path.read_text())["digest"])
+            except (OSError, ValueError, KeyError):
+                continue
+        removed = 0
+        cutoff = time.time() - grace
+        for path in (self.directory / "blobs").glob("*/*.json"):
+            try:
+                if path.stem in referenced or path.stat().st_mtime > cutoff:
+                    continue
+                path.unlink()
+            except OSError:
+                continue
+            removed += 1
+        self.replaced = 0
+        log.info(f"Removed {removed} unreferenced cached payloads")
+        return removed
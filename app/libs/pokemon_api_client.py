@@ -1,17 +1,193 @@
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from importlib.util import find_spec
+
 import httpx
 from commons import config
+from libs.pokemon_api_cache import PayloadCache
 from loguru import logger as log
 
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+# Fetches in flight per worker; bounds how many payloads wait for the consumer.
+FETCH_WINDOW_PER_WORKER = 4
+
+
+def build_http_client(timeout=None, max_connections=None, http2=None):
+    """Create the pooled, keep-alive client shared by every request of a PokemonAPIClient."""
+    timeout = config.API_TIMEOUT if timeout is None else timeout
+    max_connections = max_connections or config.API_MAX_CONNECTIONS
+    http2 = config.API_HTTP2 if http2 is None else http2
+    return httpx.Client(
+        http2=http2 and find_spec("h2") is not None,
+        timeout=httpx.Timeout(timeout, connect=config.API_CONNECT_TIMEOUT),
+        limits=httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_connections,
+        ),
+    )
+
+
+def parse_retry_after(value):
+    """Return the delay in seconds requested by a ``Retry-After`` header, if any."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
 
 class PokemonAPIClient:
-    def __init__(self):
-        self.base_url = config.API_POKEMON
+    def __init__(
+        self,
+        base_url=None,
+        client=None,
+        max_retries=None,
+        backoff_factor=None,
+        backoff_max=None,
+        cache=None,
+    ):
+        self.base_url = base_url or config.API_POKEMON
+        if cache is None and config.API_CACHE_DIR:
+            cache = PayloadCache(config.API_CACHE_DIR, ttl=config.API_CACHE_TTL)
+        self.cache = cache
+        self.cache_stats = {"hits": 0, "revalidated": 0, "misses": 0}
+        self._stats_lock = threading.Lock()
+        self.client = client or build_http_client()
+        self.max_retries = (
+            config.API_MAX_RETRIES if max_retries is None else max_retries
+        )
+        self.backoff_factor = (
+            config.API_BACKOFF_FACTOR if backoff_factor is None else backoff_factor
+        )
+        self.backoff_max = (
+            config.API_BACKOFF_MAX if backoff_max is None else backoff_max
+        )
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.client.close()
+        if self.cache and self.cache.replaced:
+            self.cache.collect_garbage()
+
+    def retry_delay(self, attempt, response=None):
+        """Jittered exponential backoff, overridden by the server's ``Retry-After``."""
+        if response is not None:
+            retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            if retry_after is not None:
+                return min(retry_after, self.backoff_max)
+        ceiling = min(self.backoff_max, self.backoff_factor * (2**attempt))
+        return random.uniform(0, ceiling)
+
+    def request(self, url, headers=None):
+        attempt = 0
+        while True:
+            try:
+                response = self.client.get(url, headers=headers)
+            except httpx.TransportError as e:
+                if attempt >= self.max_retries:
+                    raise
+                delay = self.retry_delay(attempt)
+                log.warning(f"Retrying {url} in {delay:.2f}s after {e!r}")
+            else:
+                if (
+                    response.status_code not in RETRY_STATUS_CODES
+                    or attempt >= self.max_retries
+                ):
+                    return response
+                delay = self.retry_delay(attempt, response)
+                log.warning(
+                    f"Retrying {url} in {delay:.2f}s after status {response.status_code}"
+                )
+            attempt += 1
+            time.sleep(delay)
+
+    def _count(self, stat):
+        with self._stats_lock:
+            self.cache_stats[stat] += 1
 
     def get_pokemon(self, name):
+        entry = self.cache.get(name) if self.cache else None
+        if entry and entry.is_fresh(self.cache.ttl):
+            log.info(f"Pokemon {name} served from cache")
+            self._count("hits")
+            return self.cache.load(entry)
+
         log.info(f"Getting pokemon {name}")
         url = f"{self.base_url}/{name}"
-        response = httpx.get(url)
+        response = self.request(url, headers=entry.validators() if entry else None)
+        if response.status_code == 304 and entry:
+            log.info(f"Pokemon {name} not modified, using cached payload")
+            self.cache.touch(entry)
+            self._count("revalidated")
+            return self.cache.load(entry)
         if response.status_code != 200:
             log.error(f"Error while calling the pokemon api {name} - {response.text}")
-            raise response.raise_for_status()
+            response.raise_for_status()
+        payload = response.json()
+        self._count("misses")
+        if self.cache:
+            self.cache.put(
+                {
+                    str(name),
+                    str(payload.get("id", name)),
+                    str(payload.get("name", name)),
+                },
+                response.content,
+                etag=response.headers.get("ETag"),
+                last_modified=response.headers.get("Last-Modified"),
+            )
+        return payload
+
+    def list_pokemons(self, offset=0, limit=100):
+        """Fetch one page of the API's pokemon list endpoint."""
+        log.info(f"Listing pokemons from offset {offset}")
+        response = self.request(f"{self.base_url}?offset={offset}&limit={limit}")
+        if response.status_code != 200:
+            log.error(f"Error while listing pokemons at {offset} - {response.text}")
+            response.raise_for_status()
         return response.json()
+
+    def get_pokemons(self, names, max_workers=None):
+        """Fetch several pokemons concurrently.
+
+        Yields ``(name, payload, error)`` tuples in the same order as ``names``;
+        ``error`` is the raised ``httpx.HTTPError`` when the fetch failed and
+        ``payload`` is ``None`` in that case. At most
+        ``max_workers * FETCH_WINDOW_PER_WORKER`` fetches are submitted ahead
+        of the consumer, so memory stays bounded however many names are given.
+        """
+        max_workers = max(1, max_workers or config.FETCH_CONCURRENCY)
+        window = max_workers * FETCH_WINDOW_PER_WORKER
+
+        def fetch(name):
+            try:
+                return name, self.get_pokemon(name), None
+            except httpx.HTTPError as e:
+                return name, None, e
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            pending = deque()
+            for name in names:
+                pending.append(executor.submit(fetch, name))
+                if len(pending) >= window:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
@@ -3,30 +3,41 @@ import pandas as pd
 
 
 class Pokemon(BaseDFBuilder):
+    dropped_columns = [
+        "abilities",
+        "cries",
+        "forms",
+        "game_indices",
+        "held_items",
+        "moves",
+        "species",
+        "sprites",
+        "stats",
+        "types",
+        "past_abilities",
+        "past_types",
+    ]
+
     def build_df(
         self,
     ):
         pokemon_df = pd.DataFrame([self.data])
-        pokemon_df = pokemon_df.drop(
-            columns=[
-                "abilities",
-                "cries",
-                "forms",
-                "game_indices",
-                "held_items",
-                "moves",
-                "species",
-                "sprites",
-                "stats",
-                "types",
-                "past_abilities",
-                "past_types",
-            ]
-        )
+        pokemon_df = pokemon_df.drop(columns=self.dropped_columns)
         # pokemon_df = pokemon_df.drop(columns=[
         #                                     'abilities', 'forms', 'game_indices', 'held_items', 'moves', 'stats', 'types'])
         return pokemon_df
 
+    def build_records(self):
+        return [{k: v for k, v in self.data.items() if k not in self.dropped_columns}]
+
+    @classmethod
+    def build_batch_df(cls, payloads):
+        pokemon_df = pd.DataFrame(payloads)
+        pokemon_df["species_id"] = BaseDFBuilder.extract_ids(
+            pokemon_df["species"].str.get("url")
+        )
+        return pokemon_df.drop(columns=cls.dropped_columns, errors="ignore")
+
 
 class PokemonAbilities(BaseDFBuilder):
     def build_df(self) -> pd.DataFrame:  # type: ignore
@@ -36,6 +47,23 @@ class PokemonAbilities(BaseDFBuilder):
         )
         return ability_df
 
+    def build_records(self):
+        return [
+            {
+                **ability,
+                "ability_id": BaseDFBuilder.extract_id(ability["ability"]["url"]),
+            }
+            for ability in self.data["abilities"]
+        ]
+
+    @classmethod
+    def build_batch_df(cls, payloads):
+        ability_df = BaseDFBuilder.normalize_batch(
+            payloads, "abilities", ["is_hidden", "slot", "ability.name", "ability.url"]
+        )
+        ability_df["ability_id"] = BaseDFBuilder.extract_ids(ability_df["ability.url"])
+        return ability_df
+
 
 class Abilities(BaseDFBuilder):
     def build_df(self):
@@ -49,18 +77,57 @@ class Abilities(BaseDFBuilder):
         )
         return abilities_df
 
+    def build_records(self):
+        return [
+            {
+                "name": ability["ability"]["name"],
+                "url": ability["ability"]["url"],
+                "id": BaseDFBuilder.extract_id(ability["ability"]["url"]),
+            }
+            for ability in self.data["abilities"]
+        ]
+
+    @classmethod
+    def build_batch_df(cls, payloads):
+        abilities_df = BaseDFBuilder.normalize_batch(
+            payloads, "abilities", ["ability.name", "ability.url"]
+        )
+        abilities_df["id"] = BaseDFBuilder.extract_ids(abilities_df["ability.url"])
+        abilities_df = abilities_df.drop(columns=["is_hidden", "slot"], errors="ignore")
+        return abilities_df.rename(
+            columns={"ability.name": "name", "ability.url": "url"}
+        )
+
 
 class Cries(BaseDFBuilder):
     def build_df(self):
         cries_df = pd.DataFrame([self.data["cries"]])
         return cries_df
 
+    def build_records(self):
+        return [dict(self.data["cries"])]
+
+    @classmethod
+    def build_batch_df(cls, payloads):
+        cries_df = pd.DataFrame([payload["cries"] for payload in payloads])
+        cries_df["pokemon_id"] = [payload["id"] for payload in payloads]
+        return cries_df
+
 
 class Forms(BaseDFBuilder):
     def build_df(self):
         forms_df = pd.DataFrame(self.data["forms"])
         return forms_df
 
+    def build_records(self):
+        return [dict(form) for form in self.data["forms"]]
+
+    @classmethod
+    def build_batch_df(cls, payloads):
+        forms_df = BaseDFBuilder.normalize_batch(payloads, "forms", ["name", "url"])
+        forms_df["id"] = BaseDFBuilder.extract_ids(forms_df["url"])
+        return forms_df
+
 
 class GameIndeces(BaseDFBuilder):
     def build_df(self):
@@ -73,6 +140,19 @@ class GameIndeces(BaseDFBuilder):
         )
         return game_indices_df
 
+    def build_records(self):
+        records = []
+        for game_index in self.data["game_indices"]:
+            record = BaseDFBuilder.flatten(game_index)
+            record["version_id"] = BaseDFBuilder.extract_id(record["version.url"])
+            records.append(
+                BaseDFBuilder.rename(
+                    record,
+                    {"version.name": "version_name", "version.url": "version_url"},
+                )
+            )
+        return records
+
 
 class HeldItems(BaseDFBuilder):
     def build_df(self):
@@ -87,6 +167,19 @@ class HeldItems(BaseDFBuilder):
         held_items_df = held_items_df.drop(columns=["version_details"])
         return held_items_df
 
+    def build_records(self):
+        records = []
+        for held_item in self.data["held_items"]:
+            record = BaseDFBuilder.flatten(held_item)
+            record["item_id"] = BaseDFBuilder.extract_id(record["item.url"])
+            record.pop("version_details")
+            records.append(
+                BaseDFBuilder.rename(
+                    record, {"item.name": "item_name", "item.url": "item_url"}
+                )
+            )
+        return records
+
 
 class HeldItemVersionDetails(BaseDFBuilder):
     def build_df(self) -> pd.DataFrame:
@@ -114,9 +207,28 @@ class HeldItemVersionDetails(BaseDFBuilder):
         ]
         return df_held_item_version_details_df
 
+    def build_records(self):
+        records = []
+        for held_item in self.data["held_items"]:
+            item_id = BaseDFBuilder.extract_id(held_item["item"]["url"])
+            for detail in held_item["version_details"]:
+                record = BaseDFBuilder.flatten(detail)
+                records.append(
+                    {
+                        "item_id": item_id,
+                        "rarity": record["rarity"],
+                        "version_name": record["version.name"],
+                        "version_url": record["version.url"],
+                        "version_id": BaseDFBuilder.extract_id(record["version.url"]),
+                    }
+                )
+        return records
+
 
 class MovesVersionDetails(BaseDFBuilder):
     def build_df(self):
+        if not self.data["moves"]:
+            return pd.DataFrame()
         moves_df = pd.json_normalize(
             self.data["moves"],
             record_path="version_group_details",
@@ -130,9 +242,39 @@ class MovesVersionDetails(BaseDFBuilder):
         )
         return moves_df
 
+    def build_records(self):
+        records = []
+        for move in self.data["moves"]:
+            move_id = BaseDFBuilder.extract_id(move["move"]["url"])
+            for detail in move["version_group_details"]:
+                record = BaseDFBuilder.flatten(detail)
+                record["move_url"] = move["move"]["url"]
+                record["move_name"] = move["move"]["name"]
+                record["move_id"] = move_id
+                records.append(record)
+        return records
+
+    @classmethod
+    def build_batch_df(cls, payloads):
+        moves = BaseDFBuilder.normalize_batch(
+            payloads, "moves", ["move.name", "move.url", "version_group_details"]
+        )
+        moves_df = BaseDFBuilder.explode_normalize(
+            moves,
+            "version_group_details",
+            ["pokemon_id", "move.url", "move.name"],
+            ["pokemon_id", "move.url", "move.name"],
+        )
+        moves_df["move_id"] = BaseDFBuilder.extract_ids(moves_df["move.url"])
+        return moves_df.rename(
+            columns={"move.name": "move_name", "move.url": "move_url"}
+        )
+
 
 class Moves(BaseDFBuilder):
     def build_df(self):
+        if not self.data["moves"]:
+            return pd.DataFrame()
         moves_df = pd.json_normalize(self.data["moves"])
         moves_df["id"] = moves_df["move.url"].apply(
             lambda x: BaseDFBuilder.extract_id(x)
@@ -140,6 +282,24 @@ class Moves(BaseDFBuilder):
         moves_df = moves_df.rename(columns={"move.name": "name", "move.url": "url"})
         return moves_df
 
+    def build_records(self):
+        records = []
+        for move in self.data["moves"]:
+            record = BaseDFBuilder.flatten(move)
+            record["id"] = BaseDFBuilder.extract_id(record["move.url"])
+            records.append(
+                BaseDFBuilder.rename(record, {"move.name": "name", "move.url": "url"})
+            )
+        return records
+
+    @classmethod
+    def build_batch_df(cls, payloads):
+        moves_df = BaseDFBuilder.normalize_batch(
+            payloads, "moves", ["move.name", "move.url"]
+        )
+        moves_df["id"] = BaseDFBuilder.extract_ids(moves_df["move.url"])
+        return moves_df.rename(columns={"move.name": "name", "move.url": "url"})
+
 
 class Stats(BaseDFBuilder):
     def build_df(self):
@@ -155,6 +315,24 @@ class Stats(BaseDFBuilder):
         )
         return stats_df
 
+    def build_records(self):
+        records = []
+        for stat in self.data["stats"]:
+            record = BaseDFBuilder.flatten(stat)
+            record["id"] = BaseDFBuilder.extract_id(record["stat.url"])
+            records.append(
+                BaseDFBuilder.rename(record, {"stat.name": "name", "stat.url": "url"})
+            )
+        return records
+
+    @classmethod
+    def build_batch_df(cls, payloads):
+        stats_df = BaseDFBuilder.normalize_batch(
+            payloads, "stats", ["base_stat", "effort", "stat.name", "stat.url"]
+        )
+        stats_df["id"] = BaseDFBuilder.extract_ids(stats_df["stat.url"])
+        return stats_df.rename(columns={"stat.name": "name", "stat.url": "url"})
+
 
 class Types(BaseDFBuilder):
     def build_df(self):
@@ -163,6 +341,24 @@ class Types(BaseDFBuilder):
         types = types.rename(columns={"type.name": "name", "type.url": "url"})
         return types
 
+    def build_records(self):
+        records = []
+        for type_ in self.data["types"]:
+            record = BaseDFBuilder.flatten(type_)
+            record["id"] = BaseDFBuilder.extract_id(record["type.url"])
+            records.append(
+                BaseDFBuilder.rename(record, {"type.name": "name", "type.url": "url"})
+            )
+        return records
+
+    @classmethod
+    def build_batch_df(cls, payloads):
+        types = BaseDFBuilder.normalize_batch(
+            payloads, "types", ["slot", "type.name", "type.url"]
+        )
+        types["id"] = BaseDFBuilder.extract_ids(types["type.url"])
+        return types.rename(columns={"type.name": "name", "type.url": "url"})
+
 
 class Sprite(BaseDFBuilder):
     def build_df(self):
@@ -170,6 +366,15 @@ class Sprite(BaseDFBuilder):
 
         return sprite_df
 
+    def build_records(self):
+        return [BaseDFBuilder.flatten(self.data["sprites"])]
+
+    @classmethod
+    def build_batch_df(cls, payloads):
+        sprite_df = pd.json_normalize([payload["sprites"] for payload in payloads])
+        sprite_df["pokemon_id"] = [payload["id"] for payload in payloads]
+        return sprite_df
+
 
 class Species(BaseDFBuilder):
     def build_df(self):
@@ -181,6 +386,23 @@ class Species(BaseDFBuilder):
         )
         return species_df
 
+    def build_records(self):
+        if not self.data["species"]:
+            return []
+        record = BaseDFBuilder.flatten(self.data["species"])
+        record["id"] = BaseDFBuilder.extract_id(record["url"])
+        return [record]
+
+    @classmethod
+    def build_batch_df(cls, payloads):
+        species_df = pd.json_normalize([payload["species"] for payload in payloads])
+        species_df = species_df.reindex(
+            columns=species_df.columns.union(["name", "url"], sort=False)
+        )
+        species_df["id"] = BaseDFBuilder.extract_ids(species_df["url"])
+        species_df["pokemon_id"] = [payload["id"] for payload in payloads]
+        return species_df.dropna(subset=["id"])
+
 
 class PastAbilities(BaseDFBuilder):
     def build_df(self):
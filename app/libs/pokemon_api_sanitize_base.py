@@ -2,6 +2,7 @@ from abc import ABC, abstractmethod
 import re
 import pandas as pd
 
+
 class BaseDFBuilder(ABC):
     def __init__(self, data):
         self.data = data
@@ -20,6 +21,65 @@ class BaseDFBuilder(ABC):
     def build_df(self) -> pd.DataFrame:
         raise NotImplemented
 
+    def build_records(self) -> list[dict]:
+        """Records equivalent to ``build_df().to_dict(orient="records")``.
+
+        Subclasses override this with a pure-dict implementation so callers
+        that only need records can skip building the DataFrame.
+        """
+        return self.build_df().to_dict(orient="records")
+
+    def flatten(record, prefix=""):
+        """Flatten nested dicts with dotted keys, like ``pd.json_normalize``."""
+        flat = {}
+        for key, value in record.items():
+            name = f"{prefix}{key}"
+            if isinstance(value, dict):
+                flat.update(BaseDFBuilder.flatten(value, prefix=f"{name}."))
+            else:
+                flat[name] = value
+        return flat
+
+    def rename(record, columns):
+        return {columns.get(key, key): value for key, value in record.items()}
+
+    def explode_normalize(df, column, meta, columns):
+        """Flatten the list of dicts in ``df[column]`` into one row per item.
+
+        ``meta`` columns of the parent row are carried over and ``columns``
+        are guaranteed to exist, so empty lists still yield a frame the
+        vectorized steps can work on.
+        """
+        exploded = df.explode(column, ignore_index=True).dropna(subset=[column])
+        items = pd.json_normalize(exploded[column].tolist())
+        for name in meta:
+            items[name] = exploded[name].to_numpy()
+        return items.reindex(columns=items.columns.union(columns, sort=False))
+
+    def normalize_batch(payloads, record_path, columns):
+        """Flatten the list ``record_path`` of every payload, tagged with a ``pokemon_id``."""
+        df = pd.DataFrame(
+            {
+                "pokemon_id": [payload["id"] for payload in payloads],
+                record_path: [payload.get(record_path) or [] for payload in payloads],
+            }
+        )
+        return BaseDFBuilder.explode_normalize(df, record_path, ["pokemon_id"], columns)
+
+    def extract_ids(urls: pd.Series) -> pd.Series:
+        """Vectorized ``extract_id`` for a column of API urls."""
+        ids = urls.astype("string").str.extract(r"/(\d+)/$", expand=False)
+        return pd.to_numeric(ids).astype("Int64")
+
+    def to_records(df: pd.DataFrame) -> list[dict]:
+        """``to_dict(orient="records")`` with native ints and ``None`` for missing values."""
+        return (
+            df.convert_dtypes()
+            .astype(object)
+            .where(df.notna(), None)
+            .to_dict(orient="records")
+        )
+
     def extract_id(url):
         match = re.search(r"/(\d+)/$", url)
         return int(match.group(1)) if match else None
@@ -0,0 +1,198 @@
+import io
+from collections import defaultdict
+from contextlib import contextmanager
+
+from libs import metrics
+from libs.models import aggregates
+from libs.pokemon_db_client import BULK_WRITE_ORDER, PokemonClientDB
+from libs.pokemon_stats import stats_cache
+from libs.response_cache import response_cache
+from loguru import logger as log
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+
+# Staging column numbering the rows in the order they were COPYed.
+STAGING_SEQUENCE = "staging_seq"
+
+
+def copy_value(value):
+    """Render ``value`` in PostgreSQL's COPY text format."""
+    if value is None:
+        return "\\N"
+    if isinstance(value, bool):
+        return "t" if value else "f"
+    return (
+        str(value)
+        .replace("\\", "\\\\")
+        .replace("\t", "\\t")
+        .replace("\n", "\\n")
+        .replace("\r", "\\r")
+    )
+
+
+class BulkLoader:
+    """Initial load of many pokemons in a single transaction.
+
+    On PostgreSQL every batch is COPYed into a temporary staging table per
+    target table, and ``finish`` merges each staging table with one
+    ``INSERT ... SELECT ... ON CONFLICT`` keeping the last staged row of each
+    primary key, as the regular ingest does. On SQLite rows go straight to the
+    target tables with ``executemany`` upserts on the raw connection; other
+    databases use ``PokemonClientDB.upsert``. Link rows are only added or
+    updated, never removed, so this is meant for empty databases. Nothing is
+    visible until ``finish`` commits.
+    """
+
+    def __init__(self, session):
+        self.session = session
+        self.db_client = PokemonClientDB(session=session)
+        self.dialect = session.get_bind().dialect
+        self.columns = {}
+        self.staged = set()
+        self.counts = defaultdict(int)
+
+    def quote(self, name):
+        return self.dialect.identifier_preparer.quote(name)
+
+    def columns_of(self, model, rows):
+        """Columns of ``model`` present in ``rows``.
+
+        Every batch is written with its own columns; the union over all
+        batches is kept for ``merge``.
+        """
+        present = set().union(*rows)
+        seen = self.columns.setdefault(model, set())
+        seen.update(present)
+        return [
+            column.name for column in model.__table__.columns if column.name in present
+        ]
+
+    def upsert_sql(self, model, columns, source):
+        """``INSERT INTO <table> (<columns>) <source> ON CONFLICT`` updating every column."""
+        keys = [column.name for column in model.__table__.primary_key.columns]
+        updates = ", ".join(
+            f"{self.quote(column)} = excluded.{self.quote(column)}"
+            for column in columns
+            if column not in keys
+        )
+        return (
+            f"INSERT INTO {self.quote(model.__tablename__)} "
+            f"({', '.join(self.quote(column) for column in columns)}) {source} "
+            f"ON CONFLICT ({', '.join(self.quote(key) for key in keys)}) "
+            + (f"DO UPDATE SET {updates}" if updates else "DO NOTHING")
+        )
+
+    def add(self, tables):
+        """Write or stage one batch of rows keyed by model, as built by ``rows_from_parsed``."""
+        for model in BULK_WRITE_ORDER:
+            rows = tables.get(model)
+            if not rows:
+                continue
+            columns = self.columns_of(model, rows)
+            with metrics.span(f"load.{model.__tablename__}"):
+                if self.dialect.name == "postgresql":
+                    self.copy(model, columns, rows)
+                elif self.dialect.name == "sqlite":
+                    self.executemany(model, columns, rows)
+                else:
+                    self.db_client.upsert(model, rows)
+            self.counts[model.__tablename__] += len(rows)
+
+    @contextmanager
+    def raw_cursor(self, sql):
+        """DBAPI cursor of the session's connection; driver errors become ``DBAPIError``."""
+        dbapi_error = self.dialect.loaded_dbapi.Error
+        cursor = self.session.connection().connection.cursor()
+        try:
+            yield cursor
+        except dbapi_error as e:
+            raise DBAPIError.instance(sql, None, e, dbapi_error) from e
+        finally:
+            cursor.close()
+
+    def executemany(self, model, columns, rows):
+        placeholders = ", ".join("?" for _ in columns)
+        sql = self.upsert_sql(model, columns, f"VALUES ({placeholders})")
+        with self.raw_cursor(sql) as cursor:
+            cursor.executemany(
+                sql, [tuple(row.get(column) for column in columns) for row in rows]
+            )
+
+    def copy(self, model, columns, rows):
+        staging = self.quote(f"staging_{model.__tablename__}")
+        if model not in self.staged:
+            self.session.execute(
+                text(
+                    f"CREATE TEMPORARY TABLE {staging} "
+                    f"(LIKE {self.quote(model.__tablename__)} INCLUDING DEFAULTS, "
+                    f"{STAGING_SEQUENCE} bigserial) ON COMMIT DROP"
+                )
+            )
+            self.staged.add(model)
+        buffer = io.StringIO()
+        for row in rows:
+            buffer.write("\t".join(copy_value(row.get(column)) for column in columns))
+            buffer.write("\n")
+        sql = (
+            f"COPY {staging} ({', '.join(self.quote(column) for column in columns)}) "
+            "FROM STDIN"
+        )
+        with self.raw_cursor(sql) as cursor:
+            if hasattr(cursor, "copy_expert"):
+                # psycopg2
+                buffer.seek(0)
+                cursor.copy_expert(sql, buffer)
+            else:
+                # psycopg 3
+                with cursor.copy(sql) as copy:
+                    copy.write(buffer.getvalue())
+
+    def merge(self, model):
+        """Move the staging rows of ``model`` into its table, one row per primary key.
+
+        The last row staged for a key wins, like the upserts of the regular
+        ingest.
+        """
+        columns = [
+            column.name
+            for column in model.__table__.columns
+            if column.name in self.columns[model]
+        ]
+        keys = ", ".join(
+            self.quote(column.name) for column in model.__table__.primary_key.columns
+        )
+        source = (
+            f"SELECT DISTINCT ON ({keys}) "
+            f"{', '.join(self.quote(column) for column in columns)} "
+            f"FROM {self.quote(f'staging_{model.__tablename__}')} "
+            f"ORDER BY {keys}, {STAGING_SEQUENCE} DESC"
+        )
+        self.session.execute(text(self.upsert_sql(model, columns, source)))
+
+    def finish(self):
+        """Merge the staging tables, rebuild the aggregates and commit.
+
+        Returns the number of rows loaded per table.
+        """
+        try:
+            for model in BULK_WRITE_ORDER:
+                if model in self.staged:
+                    with metrics.span(f"load.merge.{model.__tablename__}"):
+                        self.merge(model)
+            with metrics.span("load.aggregates"):
+                self.db_client.refresh_aggregates()
+            with metrics.span("load.commit"):
+                self.session.commit()
+        except Exception:
+            self.session.rollback()
+            raise
+        log.info(f"Bulk loaded {dict(self.counts)}")
+        response_cache.invalidate(
+            [
+                *self.counts,
+                aggregates.TypeCount.__tablename__,
+                aggregates.StatAggregate.__tablename__,
+            ]
+        )
+        stats_cache.invalidate()
+        return dict(self.counts)
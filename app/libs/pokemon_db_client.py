@@ -1,13 +1,557 @@
+from collections import Counter, defaultdict
+from commons import config
+from libs import metrics
+from libs.models import aggregates
 from libs.models import pokemon
 from libs.models import users
+from libs.pokemon_api_sanitize_base import BaseDFBuilder
+from libs.pokemon_reference_cache import REFERENCE_MODELS, reference_cache
+from libs.response_cache import response_cache
 from loguru import logger as log
 from sqlmodel import select
-from sqlalchemy import func
+from sqlalchemy import and_, bindparam, case, delete, func, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import joinedload, selectinload
+
+UPSERT_DIALECTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+# Parents first so every link row finds its foreign keys.
+BULK_WRITE_ORDER = [
+    pokemon.Species,
+    pokemon.Pokemon,
+    pokemon.Ability,
+    pokemon.Cries,
+    pokemon.Type,
+    pokemon.Stat,
+    pokemon.Form,
+    pokemon.Move,
+    pokemon.PokemonAbility,
+    pokemon.PokemonCry,
+    pokemon.PokemonType,
+    pokemon.PokemonStat,
+    pokemon.PokemonForm,
+    pokemon.PokemonMove,
+]
+# Pokemon columns returned by the API; payload_hash is internal.
+POKEMON_PUBLIC_COLUMNS = [
+    column
+    for column in pokemon.Pokemon.__table__.columns
+    if column.name != "payload_hash"
+]
+# Link tables feeding the aggregate tables, with the column they group by.
+AGGREGATED_LINKS = {
+    pokemon.PokemonType: "type_id",
+    pokemon.PokemonStat: "stat_id",
+}
+LINK_MODELS = {
+    pokemon.PokemonAbility,
+    pokemon.PokemonCry,
+    pokemon.PokemonType,
+    pokemon.PokemonStat,
+    pokemon.PokemonForm,
+    pokemon.PokemonMove,
+}
 
 
 class PokemonClientDB:
-    def __init__(self, session):
+    def __init__(self, session, references=None):
         self.session = session
+        self.references = reference_cache if references is None else references
+
+    @staticmethod
+    def rows_from_parsed(parsed):
+        """Map the output of ``parser_payload`` to table rows keyed by model.
+
+        Cries have no natural key in the API, so the cry row of a Pokemon is
+        stored under the Pokemon id to keep re-ingests idempotent.
+        """
+        pokemon_row = dict(parsed["Pokemon"][0])
+        pokemon_id = pokemon_row["id"]
+        if parsed["Species"]:
+            pokemon_row["species_id"] = parsed["Species"][0]["id"]
+        forms = [
+            {**form, "id": BaseDFBuilder.extract_id(form["url"])}
+            for form in parsed["Forms"]
+        ]
+        return {
+            pokemon.Species: parsed["Species"],
+            pokemon.Pokemon: [pokemon_row],
+            pokemon.Ability: [
+                {**ability["ability"], "id": ability["ability_id"]}
+                for ability in parsed["PokemonAbilities"]
+            ],
+            pokemon.PokemonAbility: [
+                {
+                    "pokemon_id": pokemon_id,
+                    "ability_id": ability["ability_id"],
+                    "is_hidden": ability["is_hidden"],
+                    "slot": ability["slot"],
+                }
+                for ability in parsed["PokemonAbilities"]
+            ],
+            pokemon.Cries: [{**cry, "id": pokemon_id} for cry in parsed["Cries"]],
+            pokemon.PokemonCry: [
+                {"pokemon_id": pokemon_id, "cry_id": pokemon_id}
+                for _ in parsed["Cries"]
+            ],
+            pokemon.Type: parsed["Type"],
+            pokemon.PokemonType: [
+                {
+                    "pokemon_id": pokemon_id,
+                    "type_id": type_["id"],
+                    "slot": type_["slot"],
+                }
+                for type_ in parsed["Type"]
+            ],
+            pokemon.Stat: parsed["Stat"],
+            pokemon.PokemonStat: [
+                {
+                    "pokemon_id": pokemon_id,
+                    "stat_id": stat["id"],
+                    "base_stat": stat["base_stat"],
+                    "effort": stat["effort"],
+                }
+                for stat in parsed["Stat"]
+            ],
+            pokemon.Form: forms,
+            pokemon.PokemonForm: [
+                {"pokemon_id": pokemon_id, "form_id": form["id"]} for form in forms
+            ],
+            pokemon.Move: parsed["Moves"],
+            pokemon.PokemonMove: [
+                {"pokemon_id": pokemon_id, "move_id": move["id"]}
+                for move in parsed["Moves"]
+            ],
+        }
+
+    @staticmethod
+    def rows_from_batch(frames):
+        """Map the DataFrames of ``parser_batch`` to table rows keyed by model."""
+        records = BaseDFBuilder.to_records
+        abilities = frames["PokemonAbilities"].rename(
+            columns={"ability.name": "name", "ability.url": "url"}
+        )
+        cries = frames["Cries"].assign(id=frames["Cries"]["pokemon_id"])
+        return {
+            pokemon.Species: records(frames["Species"][["id", "name", "url"]]),
+            pokemon.Pokemon: records(frames["Pokemon"]),
+            pokemon.Ability: records(
+                abilities[["ability_id", "name", "url"]].rename(
+                    columns={"ability_id": "id"}
+                )
+            ),
+            pokemon.PokemonAbility: records(
+                abilities[["pokemon_id", "ability_id", "is_hidden", "slot"]]
+            ),
+            pokemon.Cries: records(cries.drop(columns=["pokemon_id"])),
+            pokemon.PokemonCry: records(
+                cries[["pokemon_id", "id"]].rename(columns={"id": "cry_id"})
+            ),
+            pokemon.Type: records(frames["Type"][["id", "name", "url"]]),
+            pokemon.PokemonType: records(
+                frames["Type"][["pokemon_id", "id", "slot"]].rename(
+                    columns={"id": "type_id"}
+                )
+            ),
+            pokemon.Stat: records(frames["Stat"][["id", "name", "url"]]),
+            pokemon.PokemonStat: records(
+                frames["Stat"][["pokemon_id", "id", "base_stat", "effort"]].rename(
+                    columns={"id": "stat_id"}
+                )
+            ),
+            pokemon.Form: records(frames["Forms"][["id", "name", "url"]]),
+            pokemon.PokemonForm: records(
+                frames["Forms"][["pokemon_id", "id"]].rename(columns={"id": "form_id"})
+            ),
+            pokemon.Move: records(frames["Moves"][["id", "name", "url"]]),
+            pokemon.PokemonMove: records(
+                frames["Moves"][["pokemon_id", "id"]].rename(columns={"id": "move_id"})
+            ),
+        }
+
+    def upsert(self, model, rows):
+        """Insert ``rows`` into ``model``'s table, updating rows whose primary key exists.
+
+        Runs a single ``INSERT ... ON CONFLICT`` statement (executed as a batch)
+        on PostgreSQL and SQLite and falls back to ``session.merge`` elsewhere.
+        Does not commit.
+        """
+        table = model.__table__
+        columns = [column.name for column in table.columns]
+        keys = [column.name for column in table.primary_key.columns]
+        unique_rows = {}
+        for row in rows:
+            values = {column: row.get(column) for column in columns if column in row}
+            unique_rows[tuple(values.get(key) for key in keys)] = values
+        if not unique_rows:
+            return 0
+        present = [c for c in columns if any(c in r for r in unique_rows.values())]
+        rows = [{c: row.get(c) for c in present} for row in unique_rows.values()]
+
+        insert = UPSERT_DIALECTS.get(self.session.get_bind().dialect.name)
+        if insert is None:
+            for row in rows:
+                self.session.merge(model(**row))
+            return len(rows)
+        stmt = insert(table)
+        updates = {c: stmt.excluded[c] for c in present if c not in keys}
+        if updates:
+            stmt = stmt.on_conflict_do_update(index_elements=keys, set_=updates)
+        else:
+            stmt = stmt.on_conflict_do_nothing(index_elements=keys)
+        self.session.execute(stmt, rows)
+        return len(rows)
+
+    def sync_links(self, model, rows, pokemon_ids):
+        """Make the ``model`` link rows of ``pokemon_ids`` match ``rows``.
+
+        Existing links are read with one SELECT; only links that are new or
+        whose values changed are upserted and only links missing from
+        ``rows`` are deleted. Returns the written rows, the primary keys
+        (prefixed with ``old_``) of the deleted ones and the stored rows that
+        were overwritten or deleted. Does not commit.
+        """
+        table = model.__table__
+        keys = [column.name for column in table.primary_key.columns]
+        existing = {
+            tuple(row[key] for key in keys): row
+            for row in self.session.execute(
+                select(table).where(table.c.pokemon_id.in_(pokemon_ids))
+            ).mappings()
+        }
+        wanted = {tuple(row[key] for key in keys): row for row in rows}
+        changed = [
+            row
+            for key, row in wanted.items()
+            if key not in existing
+            or any(
+                existing[key][column] != value
+                for column, value in row.items()
+                if column in table.c
+            )
+        ]
+        stale = [
+            {f"old_{column}": value for column, value in zip(keys, key)}
+            for key in existing
+            if key not in wanted
+        ]
+        previous = [
+            dict(row)
+            for key, row in existing.items()
+            if key not in wanted
+            or any(
+                row[column] != value
+                for column, value in wanted[key].items()
+                if column in table.c
+            )
+        ]
+        if stale:
+            self.session.execute(
+                delete(table).where(
+                    and_(*[table.c[key] == bindparam(f"old_{key}") for key in keys])
+                ),
+                stale,
+            )
+        self.upsert(model, changed)
+        return changed, stale, previous
+
+    def get_payload_hashes(self, pokemon_ids):
+        """Stored payload hash of each already ingested pokemon in ``pokemon_ids``."""
+        stmt = select(pokemon.Pokemon.id, pokemon.Pokemon.payload_hash).where(
+            pokemon.Pokemon.id.in_(pokemon_ids)
+        )
+        return dict(self.session.exec(stmt).all())
+
+    def bulk_create(self, parsed_payloads, payload_hashes=None):
+        """Write several parsed pokemons with one statement per table and one commit."""
+        tables = defaultdict(list)
+        for parsed in parsed_payloads:
+            for model, rows in self.rows_from_parsed(parsed).items():
+                tables[model].extend(rows)
+        return self.write_tables(tables, payload_hashes)
+
+    def bulk_create_batch(self, frames, payload_hashes=None):
+        """Write the output of ``parser_batch`` with one statement per table and one commit."""
+        return self.write_tables(self.rows_from_batch(frames), payload_hashes)
+
+    def write_tables(self, tables, payload_hashes=None):
+        pokemon_rows = tables.get(pokemon.Pokemon, [])
+        pokemon_ids = [row["id"] for row in pokemon_rows]
+        if payload_hashes:
+            for row in pokemon_rows:
+                row["payload_hash"] = payload_hashes.get(row["id"])
+        if config.REFERENCE_CACHE_WARM:
+            self.references.warm(self.session)
+        written = {}
+        added = {model: [] for model in AGGREGATED_LINKS}
+        removed = {model: [] for model in AGGREGATED_LINKS}
+        modified = set()
+        try:
+            for model in BULK_WRITE_ORDER:
+                rows = tables.get(model, [])
+                if model in REFERENCE_MODELS:
+                    rows = written[model] = self.references.unknown(model, rows)
+                with metrics.span(f"write.{model.__tablename__}"):
+                    if model in LINK_MODELS:
+                        changed, stale, previous = self.sync_links(
+                            model, rows, pokemon_ids
+                        )
+                        log.debug(
+                            f"{model.__tablename__}: {len(changed)} links written, "
+                            f"{len(stale)} removed"
+                        )
+                        if model in AGGREGATED_LINKS:
+                            added[model], removed[model] = changed, previous
+                        if changed or stale:
+                            modified.add(model.__tablename__)
+                    else:
+                        count = self.upsert(model, rows)
+                        log.debug(f"Upserted {count} rows into {model.__tablename__}")
+                        if count:
+                            modified.add(model.__tablename__)
+            with metrics.span("write.aggregates"):
+                modified.update(self.apply_aggregate_deltas(added, removed, tables))
+            with metrics.span("write.commit"):
+                self.session.commit()
+        except Exception:
+            self.session.rollback()
+            raise
+        for model, rows in written.items():
+            self.references.add(model, rows)
+        response_cache.invalidate(modified)
+        return pokemon_ids
+
+    @staticmethod
+    def link_deltas(added, removed):
+        """Change of every aggregate row implied by the link rows written and removed.
+
+        Returns the pokemon count delta per type id, the total/count delta and
+        the min/max of the added values per stat id, and the stat ids that
+        lost a value and need their min and max looked up again.
+        """
+        type_deltas = Counter()
+        for row in added[pokemon.PokemonType]:
+            type_deltas[row["type_id"]] += 1
+        for row in removed[pokemon.PokemonType]:
+            type_deltas[row["type_id"]] -= 1
+        stat_deltas = {}
+        for row in added[pokemon.PokemonStat]:
+            delta = stat_deltas.setdefault(
+                row["stat_id"], {"total": 0, "count": 0, "min": None, "max": None}
+            )
+            value = row.get("base_stat")
+            if value is None:
+                continue
+            delta["total"] += value
+            delta["count"] += 1
+            delta["min"] = value if delta["min"] is None else min(delta["min"], value)
+            delta["max"] = value if delta["max"] is None else max(delta["max"], value)
+        shrunk = set()
+        for row in removed[pokemon.PokemonStat]:
+            delta = stat_deltas.setdefault(
+                row["stat_id"], {"total": 0, "count": 0, "min": None, "max": None}
+            )
+            if row["base_stat"] is not None:
+                delta["total"] -= row["base_stat"]
+                delta["count"] -= 1
+                shrunk.add(row["stat_id"])
+        return (
+            {type_id: delta for type_id, delta in type_deltas.items() if delta},
+            stat_deltas,
+            shrunk,
+        )
+
+    def apply_aggregate_deltas(self, added, removed, tables=None):
+        """Fold the link rows a write added and removed into the aggregate tables.
+
+        ``added`` and ``removed`` map each model of ``AGGREGATED_LINKS`` to its
+        rows; a link whose values changed is in both. Type and stat names come
+        from the rows of the batch (``tables``) where possible. Counts and sums are
+        incremented in place (``count = count + excluded.count``) and min/max
+        folded in with ``LEAST``/``GREATEST``-style expressions, so concurrent
+        writers do not overwrite each other's changes. Stats that lost a value
+        have their min and max looked up again through
+        ``ix_pokemonstat_stat_id_base_stat`` after locking their aggregate
+        rows. Dialects without ``ON CONFLICT`` recompute the touched rows.
+        Returns the names of the aggregate tables written. Does not commit.
+        """
+        type_deltas, stat_deltas, shrunk = self.link_deltas(added, removed)
+        insert = UPSERT_DIALECTS.get(self.session.get_bind().dialect.name)
+        if insert is None:
+            self.refresh_aggregates(set(type_deltas), set(stat_deltas))
+        else:
+            tables = tables or {}
+            if type_deltas:
+                names = self.reference_names(
+                    pokemon.Type, type_deltas, tables.get(pokemon.Type, [])
+                )
+                self.add_type_counts(insert, type_deltas, names)
+            if stat_deltas:
+                names = self.reference_names(
+                    pokemon.Stat, stat_deltas, tables.get(pokemon.Stat, [])
+                )
+                self.add_stat_aggregates(insert, stat_deltas, shrunk, names)
+        modified = set()
+        if type_deltas:
+            modified.add(aggregates.TypeCount.__tablename__)
+        if stat_deltas:
+            modified.add(aggregates.StatAggregate.__tablename__)
+        return modified
+
+    def reference_names(self, model, ids, rows):
+        """Name of every ``model`` id in ``ids``, from ``rows`` and else the database.
+
+        Ids found in neither are left out with a warning; ``check-aggregates
+        --fix`` rebuilds their aggregate rows.
+        """
+        names = {row["id"]: row["name"] for row in rows if row["id"] in ids}
+        missing = [id_ for id_ in ids if id_ not in names]
+        if missing:
+            names.update(
+                self.session.exec(
+                    select(model.id, model.name).where(model.id.in_(missing))
+                ).all()
+            )
+        unknown = sorted(id_ for id_ in ids if id_ not in names)
+        if unknown:
+            log.warning(
+                f"No {model.__tablename__} rows for ids {unknown}, "
+                "their aggregates were not updated"
+            )
+        return names
+
+    def add_type_counts(self, insert, deltas, names):
+        table = aggregates.TypeCount.__table__
+        stmt = insert(table)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["type_id"],
+            set_={
+                "type_name": stmt.excluded.type_name,
+                "total_pokemons": table.c.total_pokemons + stmt.excluded.total_pokemons,
+            },
+        )
+        # Rows in key order, so concurrent writers lock them in the same order.
+        rows = [
+            {"type_id": type_id, "type_name": names[type_id], "total_pokemons": delta}
+            for type_id, delta in sorted(deltas.items())
+            if type_id in names
+        ]
+        if rows:
+            self.session.execute(stmt, rows)
+
+    def add_stat_aggregates(self, insert, deltas, shrunk, names):
+        table = aggregates.StatAggregate.__table__
+        stmt = insert(table)
+        excluded = stmt.excluded
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["stat_id"],
+            set_={
+                "stat_name": excluded.stat_name,
+                "total": table.c["total"] + excluded.total,
+                "count": table.c["count"] + excluded["count"],
+                "min": case(
+                    (table.c["min"].is_(None), excluded["min"]),
+                    (excluded["min"] < table.c["min"], excluded["min"]),
+                    else_=table.c["min"],
+                ),
+                "max": case(
+                    (table.c["max"].is_(None), excluded["max"]),
+                    (excluded["max"] > table.c["max"], excluded["max"]),
+                    else_=table.c["max"],
+                ),
+            },
+        )
+        rows = [
+            {"stat_id": stat_id, "stat_name": names[stat_id], **delta}
+            for stat_id, delta in sorted(deltas.items())
+            if stat_id in names
+        ]
+        if rows:
+            self.session.execute(stmt, rows)
+        if not shrunk:
+            return
+        stat_ids = sorted(shrunk)
+        # Lock the rows before reading the stats again, so the lookup below
+        # sees every writer that updated them first.
+        self.session.execute(
+            select(table.c.stat_id)
+            .where(table.c.stat_id.in_(stat_ids))
+            .order_by(table.c.stat_id)
+            .with_for_update()
+        )
+        base_stat = pokemon.PokemonStat.base_stat
+        same_stat = pokemon.PokemonStat.stat_id == table.c.stat_id
+        self.session.execute(
+            update(table)
+            .where(table.c.stat_id.in_(stat_ids))
+            .values(
+                min=select(func.min(base_stat)).where(same_stat).scalar_subquery(),
+                max=select(func.max(base_stat)).where(same_stat).scalar_subquery(),
+            )
+        )
+
+    def type_count_rows(self, type_ids=None):
+        """Pokemon count of each type in ``type_ids`` (every type when ``None``)."""
+        stmt = (
+            select(
+                pokemon.Type.id,
+                pokemon.Type.name,
+                func.count(pokemon.PokemonType.pokemon_id),
+            )
+            .outerjoin(
+                pokemon.PokemonType, pokemon.Type.id == pokemon.PokemonType.type_id
+            )
+            .group_by(pokemon.Type.id, pokemon.Type.name)
+        )
+        if type_ids is not None:
+            stmt = stmt.where(pokemon.Type.id.in_(type_ids))
+        return [
+            {"type_id": type_id, "type_name": name, "total_pokemons": total}
+            for type_id, name, total in self.session.exec(stmt).all()
+        ]
+
+    def stat_aggregate_rows(self, stat_ids=None):
+        """Sum, count, min and max of each stat in ``stat_ids`` (every stat when ``None``)."""
+        base_stat = pokemon.PokemonStat.base_stat
+        stmt = (
+            select(
+                pokemon.Stat.id,
+                pokemon.Stat.name,
+                func.coalesce(func.sum(base_stat), 0),
+                func.count(base_stat),
+                func.min(base_stat),
+                func.max(base_stat),
+            )
+            .outerjoin(
+                pokemon.PokemonStat, pokemon.Stat.id == pokemon.PokemonStat.stat_id
+            )
+            .group_by(pokemon.Stat.id, pokemon.Stat.name)
+        )
+        if stat_ids is not None:
+            stmt = stmt.where(pokemon.Stat.id.in_(stat_ids))
+        return [
+            {
+                "stat_id": stat_id,
+                "stat_name": name,
+                "total": total,
+                "count": count,
+                "min": min_,
+                "max": max_,
+            }
+            for stat_id, name, total, count, min_, max_ in self.session.exec(stmt).all()
+        ]
+
+    def refresh_aggregates(self, type_ids=None, stat_ids=None):
+        """Recompute the aggregate rows of the given types and stats from the links.
+
+        ``None`` refreshes every type or stat and an empty collection none of
+        them. Used by bulk loads and ``check-aggregates --fix``; the ingest
+        applies deltas with ``apply_aggregate_deltas``. Does not commit.
+        """
+        if type_ids is None or type_ids:
+            self.upsert(aggregates.TypeCount, self.type_count_rows(type_ids))
+        if stat_ids is None or stat_ids:
+            self.upsert(aggregates.StatAggregate, self.stat_aggregate_rows(stat_ids))
 
     def create_species(self, species_data):
         for specie in species_data:
@@ -135,14 +679,80 @@ class PokemonClientDB:
         self.session.commit()
         return move_obj
 
-    def get_pokemon_by_type(self, type_filter):
-        return (
-            self.session.query(pokemon.Pokemon)
+    @staticmethod
+    def keyset(stmt, after_id=None, limit=None):
+        """Order ``stmt`` by pokemon id and keep the page that follows ``after_id``."""
+        stmt = stmt.order_by(pokemon.Pokemon.id)
+        if after_id is not None:
+            stmt = stmt.where(pokemon.Pokemon.id > after_id)
+        if limit is not None:
+            stmt = stmt.limit(limit)
+        return stmt
+
+    def stream(self, stmt, batch_size=None):
+        """Yield the rows of ``stmt`` as dicts, fetching ``batch_size`` at a time.
+
+        Uses a server-side cursor where the driver supports one, so memory
+        does not grow with the size of the result.
+        """
+        stmt = stmt.execution_options(
+            stream_results=True, yield_per=batch_size or config.STREAM_BATCH_SIZE
+        )
+        for row in self.session.execute(stmt).mappings():
+            yield dict(row)
+
+    def get_pokemon_by_type(self, type_filter, after_id=None, limit=None):
+        stmt = (
+            select(pokemon.Pokemon)
             .join(pokemon.PokemonType)
             .join(pokemon.Type)
-            .filter(pokemon.Type.name == type_filter)
-            .all()
+            .where(pokemon.Type.name == type_filter)
         )
+        if after_id is not None or limit is not None:
+            stmt = self.keyset(stmt, after_id, limit)
+        return self.session.exec(stmt).all()
+
+    def stream_pokemon_by_type(self, type_filter, after_id=None, limit=None):
+        stmt = (
+            select(*POKEMON_PUBLIC_COLUMNS)
+            .join(pokemon.PokemonType)
+            .join(pokemon.Type)
+            .where(pokemon.Type.name == type_filter)
+        )
+        return self.stream(self.keyset(stmt, after_id, limit))
+
+    def get_full_pokemons(
+        self, pokemon_id=None, name=None, type_filter=None, after_id=None, limit=None
+    ):
+        """Pokemons with every relationship loaded up front.
+
+        The many-to-one sides are joined and every collection is fetched with
+        one ``SELECT ... IN`` per relationship, so the number of queries does
+        not depend on how many pokemons match.
+        """
+        stmt = select(pokemon.Pokemon).options(
+            joinedload(pokemon.Pokemon.species),
+            selectinload(pokemon.Pokemon.abilities).joinedload(
+                pokemon.PokemonAbility.ability
+            ),
+            selectinload(pokemon.Pokemon.cries).joinedload(pokemon.PokemonCry.cry),
+            selectinload(pokemon.Pokemon.moves).joinedload(pokemon.PokemonMove.move),
+            selectinload(pokemon.Pokemon.stats).joinedload(pokemon.PokemonStat.stat),
+            selectinload(pokemon.Pokemon.types).joinedload(pokemon.PokemonType.type),
+            selectinload(pokemon.Pokemon.forms),
+        )
+        if pokemon_id is not None:
+            stmt = stmt.where(pokemon.Pokemon.id == pokemon_id)
+        if name is not None:
+            stmt = stmt.where(pokemon.Pokemon.name == name)
+        if type_filter is not None:
+            type_ids = (
+                select(pokemon.PokemonType.pokemon_id)
+                .join(pokemon.Type)
+                .where(pokemon.Type.name == type_filter)
+            )
+            stmt = stmt.where(pokemon.Pokemon.id.in_(type_ids))
+        return self.session.exec(self.keyset(stmt, after_id, limit)).all()
 
     def get_top_pokemons(self, limit, order_by):
         if order_by == "base_experience_desc":
@@ -162,31 +772,72 @@ class PokemonClientDB:
         else:
             return self.session.query(pokemon.Pokemon).limit(limit).all()
 
-    def get_pokemons_by_species(self):
+    def get_pokemons_by_species(self, after_id=None, limit=None):
         stmt = select(pokemon.Pokemon, pokemon.Species).join(
             pokemon.Species, pokemon.Pokemon.species_id == pokemon.Species.id
         )
+        if after_id is not None or limit is not None:
+            stmt = self.keyset(stmt, after_id, limit)
         result = self.session.exec(stmt)
         return result.all()
 
+    def stream_pokemons_by_species(self, after_id=None, limit=None):
+        stmt = select(
+            pokemon.Pokemon.id,
+            pokemon.Pokemon.name,
+            pokemon.Species.name.label("species"),
+            pokemon.Species.id.label("species_id"),
+        ).join(pokemon.Species, pokemon.Pokemon.species_id == pokemon.Species.id)
+        return self.stream(self.keyset(stmt, after_id, limit))
+
     def get_pokemon_count(self):
+        type_count = aggregates.TypeCount
         stmt = (
             select(
-                pokemon.Type.name,
-                func.count(pokemon.PokemonType.pokemon_id).label("total_pokemons"),
+                type_count.type_name,
+                func.sum(type_count.total_pokemons).label("total_pokemons"),
             )
-            .join(pokemon.PokemonType, pokemon.Type.id == pokemon.PokemonType.type_id)
-            .group_by(pokemon.Type.name)
+            .where(type_count.total_pokemons > 0)
+            .group_by(type_count.type_name)
         )
 
         result = self.session.exec(stmt)
         return result.all()
 
-    def get_hp_average(self):
+    def get_stat_values(self):
+        """``(pokemon_id, stat_name, base_stat, species_name, type_name)`` rows.
+
+        Every pokemon stat comes back once per type of its pokemon (once with
+        a ``None`` type for untyped pokemons), so stat values and type labels
+        are read in a single pass.
+        """
         stmt = (
-            select(func.avg(pokemon.PokemonStat.base_stat))
+            select(
+                pokemon.PokemonStat.pokemon_id,
+                pokemon.Stat.name,
+                pokemon.PokemonStat.base_stat,
+                pokemon.Species.name,
+                pokemon.Type.name,
+            )
             .join(pokemon.Stat, pokemon.PokemonStat.stat_id == pokemon.Stat.id)
-            .where(pokemon.Stat.name == "hp")
+            .join(pokemon.Pokemon, pokemon.PokemonStat.pokemon_id == pokemon.Pokemon.id)
+            .outerjoin(
+                pokemon.Species, pokemon.Pokemon.species_id == pokemon.Species.id
+            )
+            .outerjoin(
+                pokemon.PokemonType,
+                pokemon.PokemonType.pokemon_id == pokemon.PokemonStat.pokemon_id,
+            )
+            .outerjoin(pokemon.Type, pokemon.PokemonType.type_id == pokemon.Type.id)
+            .where(pokemon.PokemonStat.base_stat.is_not(None))
+            .order_by(pokemon.PokemonStat.pokemon_id, pokemon.PokemonStat.stat_id)
         )
-        result = self.session.exec(stmt)
-        return result.one()
+        return self.session.exec(stmt).all()
+
+    def get_hp_average(self):
+        stat_aggregate = aggregates.StatAggregate
+        stmt = select(
+            func.sum(stat_aggregate.total), func.sum(stat_aggregate.count)
+        ).where(stat_aggregate.stat_name == "hp")
+        total, count = self.session.exec(stmt).one()
+        return total / count if count else None
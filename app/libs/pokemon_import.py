@@ -0,0 +1,116 @@
+import gzip
+import io
+import json
+from importlib import import_module
+from pathlib import Path
+
+from commons import config
+from libs import pokemon_ingest
+from libs.models import pokemon
+from libs.models import users
+from libs.pokemon_bulk_load import BulkLoader
+from loguru import logger as log
+
+
+def open_dump(path):
+    """Open an NDJSON dump as text, decompressing ``.gz`` and ``.zst`` files on the fly.
+
+    zstd needs the optional ``zstandard`` package.
+    """
+    path = Path(path)
+    if path.suffix == ".gz":
+        return gzip.open(path, "rt", encoding="utf-8")
+    if path.suffix in (".zst", ".zstd"):
+        try:
+            zstandard = import_module("zstandard")
+        except ImportError:
+            raise RuntimeError(
+                f"Reading {path} needs the zstandard package (pip install zstandard)"
+            ) from None
+        reader = zstandard.ZstdDecompressor().stream_reader(path.open("rb"))
+        return io.TextIOWrapper(reader, encoding="utf-8")
+    return path.open(encoding="utf-8")
+
+
+def read_payloads(paths):
+    """Yield ``(name, payload, error)`` for every line of the dumps in ``paths``.
+
+    One PokeAPI ``/pokemon`` payload per line; blank lines are skipped. Lines
+    that are not a JSON object with an ``id`` and a ``name`` are yielded with
+    an error and ``<path>:<line>`` as their name.
+    """
+    for path in paths:
+        with open_dump(path) as dump:
+            for number, line in enumerate(dump, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    payload = json.loads(line)
+                    if not isinstance(payload, dict):
+                        raise ValueError("not a JSON object")
+                    if "id" not in payload or "name" not in payload:
+                        raise ValueError("payload without id or name")
+                except ValueError as e:
+                    yield f"{path}:{number}", None, e
+                    continue
+                yield payload["name"], payload, None
+
+
+def import_dumps(paths, batch_size=None, force=False, mode=None):
+    """Parse and store every payload of the dumps, yielding one status per pokemon."""
+    payloads = pokemon_ingest.timed(read_payloads(paths), "read")
+    yield from pokemon_ingest.ingest_payloads(payloads, batch_size, force, mode)
+
+
+def parse_tables(payloads, mode=None):
+    """``pokemon_ingest.parse_tables`` with the payload hash set on every pokemon row."""
+    tables = pokemon_ingest.parse_tables(payloads, mode)
+    hashes = {
+        payload["id"]: pokemon_ingest.payload_hash(payload) for payload in payloads
+    }
+    for row in tables.get(pokemon.Pokemon, []):
+        row["payload_hash"] = hashes[row["id"]]
+    return tables
+
+
+def stage_batch(loader, batch, mode):
+    """Hand a batch to ``loader``; if it does not parse, retry one pokemon at a time."""
+    try:
+        tables = parse_tables([payload for _, payload in batch], mode)
+    except (KeyError, TypeError, ValueError) as e:
+        if len(batch) == 1:
+            log.error(f"Error parsing pokemon {batch[0][0]} - {e}")
+            return [{"pokemon": batch[0][0], "status": "error"}]
+        results = []
+        for item in batch:
+            results.extend(stage_batch(loader, [item], mode))
+        return results
+    loader.add(tables)
+    return [{"pokemon": name, "status": "ingested"} for name, _ in batch]
+
+
+def bulk_import_dumps(paths, batch_size=None, mode=None):
+    """Load every payload of the dumps with a ``BulkLoader``, in one transaction.
+
+    Nothing is committed until the last dump is read, and a failure while
+    writing rolls the whole load back, so statuses are only yielded once the
+    load has committed.
+    """
+    batch_size = max(1, batch_size or config.INGEST_BATCH_SIZE)
+    statuses = []
+    with users.get_session() as session:
+        loader = BulkLoader(session)
+        batch = []
+        for name, payload, error in pokemon_ingest.timed(read_payloads(paths), "read"):
+            if error is not None:
+                log.error(f"Skipping pokemon {name} - {error}")
+                statuses.append({"pokemon": name, "status": "error"})
+                continue
+            batch.append((name, payload))
+            if len(batch) >= batch_size:
+                statuses.extend(stage_batch(loader, batch, mode))
+                batch = []
+        if batch:
+            statuses.extend(stage_batch(loader, batch, mode))
+        loader.finish()
+    yield from statuses
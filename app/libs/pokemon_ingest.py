@@ -0,0 +1,242 @@
+import hashlib
+import json
+import multiprocessing
+import threading
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from commons import config
+from libs import metrics
+from libs import pokemon_db_client
+from libs import pokemon_parser as parser
+from libs.pokemon_stats import stats_cache
+from libs.models import users
+from loguru import logger as log
+
+
+def payload_hash(payload):
+    """Stable sha256 of an API payload, independent of key order."""
+    body = json.dumps(payload, sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(body.encode()).hexdigest()
+
+
+def parse_tables(payloads, mode=None):
+    """Parse payloads into the table rows written by ``write_tables``, keyed by model.
+
+    Only the ``PERSISTED_ENTITIES`` are built and the result holds plain
+    dicts, so it is cheap to send back from a parse worker process.
+    """
+    mode = mode or config.PARSER_MODE
+    rows_from_parsed = pokemon_db_client.PokemonClientDB.rows_from_parsed
+    if mode == "batch":
+        frames = parser.parser_batch(payloads)
+        return pokemon_db_client.PokemonClientDB.rows_from_batch(frames)
+    tables = defaultdict(list)
+    for payload in payloads:
+        parsed = parser.parser_payload(payload, mode)
+        for model, rows in rows_from_parsed(parsed).items():
+            tables[model].extend(rows)
+    return dict(tables)
+
+
+def parse_tables_in_worker(payloads, mode=None):
+    """``parse_tables`` run by a ``parse_pool`` process.
+
+    Returns the tables with the spans the parse recorded, which the parent
+    replays with ``metrics.record`` so they reach its timings and histograms.
+    """
+    with metrics.collect_spans() as spans:
+        tables = parse_tables(payloads, mode)
+    return tables, spans
+
+
+class ParsePool:
+    """Processes running ``parse_tables_in_worker`` for the ingest, started on first use.
+
+    With ``workers`` set to 0 (the default) payloads are parsed in the
+    ingest thread. Workers are spawned rather than forked, since the parent
+    runs request and ingest threads.
+    """
+
+    def __init__(self, workers=None):
+        self.workers = config.PARSE_WORKERS if workers is None else workers
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def executor(self):
+        if self.workers <= 0:
+            return None
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+                log.info(f"Started {self.workers} parse workers")
+            return self._executor
+
+    def shutdown(self):
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown()
+                self._executor = None
+
+
+parse_pool = ParsePool()
+
+
+def write_batch(batch, mode=None, force=False):
+    """Parse and store a batch of ``(name, payload)`` pairs in a single transaction.
+
+    ``mode`` is a ``parser_payload`` mode or ``"batch"`` to parse the whole
+    batch with ``parser_batch``. Pokemons whose payload hash matches the
+    stored one are reported as ``"unchanged"`` without being parsed or
+    written, unless ``force`` is set. When the batch fails as a whole it is
+    retried one pokemon at a time, so a single bad payload only marks that
+    pokemon as failed.
+    """
+    mode = mode or config.PARSER_MODE
+    hashes = {payload["id"]: payload_hash(payload) for _, payload in batch}
+    with users.get_session() as session:
+        db_client = pokemon_db_client.PokemonClientDB(session=session)
+        try:
+            with metrics.span("diff"):
+                stored = {} if force else db_client.get_payload_hashes(list(hashes))
+            results = []
+            changed = []
+            for name, payload in batch:
+                if stored.get(payload["id"]) == hashes[payload["id"]]:
+                    results.append({"pokemon": name, "status": "unchanged"})
+                else:
+                    changed.append((name, payload))
+            if changed:
+                payloads = [payload for _, payload in changed]
+                log.info(f"Parsing {len(payloads)} pokemons ({mode})")
+                db_client.write_tables(parse_tables(payloads, mode), hashes)
+                stats_cache.invalidate()
+            results.extend(
+                {"pokemon": name, "status": "ingested"} for name, _ in changed
+            )
+            return results
+        except Exception as e:
+            log.error(f"Error writing batch of {len(batch)} pokemons - {e}")
+    if len(batch) == 1:
+        return [{"pokemon": batch[0][0], "status": "error"}]
+    results = []
+    for item in batch:
+        results.extend(write_batch([item], mode, force))
+    return results
+
+
+def timed(items, stage):
+    """Yield from ``items``, timing each step as ``stage`` net of the consumer's work."""
+    while True:
+        with metrics.span(stage):
+            item = next(items, None)
+        if item is None:
+            return
+        yield item
+
+
+def submit_batch(executor, batch, mode=None, force=False):
+    """Diff a batch with the stored hashes and send its changed payloads to ``executor``.
+
+    Returns what ``finish_batch`` needs: the statuses of the unchanged
+    pokemons, the changed ``(name, payload)`` pairs, their hashes and the
+    future of their parse (``None`` when nothing changed).
+    """
+    hashes = {payload["id"]: payload_hash(payload) for _, payload in batch}
+    stored = {}
+    if not force:
+        with users.get_session() as session, metrics.span("diff"):
+            db_client = pokemon_db_client.PokemonClientDB(session=session)
+            stored = db_client.get_payload_hashes(list(hashes))
+    results = []
+    changed = []
+    for name, payload in batch:
+        if stored.get(payload["id"]) == hashes[payload["id"]]:
+            results.append({"pokemon": name, "status": "unchanged"})
+        else:
+            changed.append((name, payload))
+    future = None
+    if changed:
+        payloads = [payload for _, payload in changed]
+        future = executor.submit(
+            parse_tables_in_worker, payloads, mode or config.PARSER_MODE
+        )
+    return results, changed, hashes, future
+
+
+def finish_batch(results, changed, hashes, future, mode=None, force=False):
+    """Write a batch sent by ``submit_batch`` once its parse is done.
+
+    When the parse or the write fails the changed pokemons go through
+    ``write_batch`` one at a time, as a failed batch does there.
+    """
+    if future is None:
+        return results
+    try:
+        with metrics.span("parse.wait"):
+            tables, spans = future.result()
+        for span in spans:
+            metrics.record(*span)
+        log.info(f"Writing {len(changed)} pokemons parsed by the pool")
+        with users.get_session() as session:
+            db_client = pokemon_db_client.PokemonClientDB(session=session)
+            db_client.write_tables(tables, hashes)
+        stats_cache.invalidate()
+    except Exception as e:
+        log.error(f"Error writing batch of {len(changed)} pokemons - {e}")
+        for item in changed:
+            results.extend(write_batch([item], mode, force))
+        return results
+    results.extend({"pokemon": name, "status": "ingested"} for name, _ in changed)
+    return results
+
+
+def ingest_payloads(items, batch_size=None, force=False, mode=None):
+    """Store ``(name, payload, error)`` items in batches, yielding one status per pokemon.
+
+    Items with an ``error`` are reported as ``"error"`` without being written.
+    Only a few batches are held in memory at a time, so ``items`` can be a
+    generator over any number of payloads. With ``PARSE_WORKERS`` set,
+    batches are parsed by the ``parse_pool`` processes while this thread
+    keeps reading items, and are written here one at a time in order.
+    """
+    batch_size = max(1, batch_size or config.INGEST_BATCH_SIZE)
+    executor = parse_pool.executor()
+    pending = deque()
+
+    def dispatch(batch):
+        if executor is None:
+            yield from write_batch(batch, mode, force)
+            return
+        pending.append(submit_batch(executor, batch, mode, force))
+        # One batch in flight per worker keeps them busy without unbounded read-ahead.
+        while len(pending) > parse_pool.workers:
+            yield from finish_batch(*pending.popleft(), mode, force)
+
+    batch = []
+    for name, payload, error in items:
+        if error is not None:
+            log.error(f"Skipping pokemon {name} - {error}")
+            yield {"pokemon": name, "status": "error"}
+            continue
+        batch.append((name, payload))
+        if len(batch) >= batch_size:
+            yield from dispatch(batch)
+            batch = []
+    if batch:
+        yield from dispatch(batch)
+    while pending:
+        yield from finish_batch(*pending.popleft(), mode, force)
+
+
+def ingest_pokemons(api, names, concurrency=None, batch_size=None, force=False):
+    """Fetch, parse and store ``names``, yielding one status dict per pokemon.
+
+    Statuses are ``"ingested"``, ``"unchanged"`` (same payload as the last
+    ingest, skipped unless ``force``) or ``"error"``.
+    """
+    # Time spent waiting on the API, net of the writes done in between.
+    fetched = timed(api.get_pokemons(names, concurrency), "fetch")
+    yield from ingest_payloads(fetched, batch_size, force)
@@ -0,0 +1,254 @@
+import os
+import threading
+import time
+import uuid
+from datetime import timedelta
+
+from commons import config
+from libs import metrics
+from libs import pokemon_api_client
+from libs import pokemon_ingest
+from libs.models import users
+from libs.models.jobs import IngestJob, utcnow
+from loguru import logger as log
+from sqlalchemy import update
+from sqlmodel import select
+
+
+def enqueue(pokemons, concurrency=None, requested_by=None, force=False):
+    """Store a new ingest job for the worker pool and return it."""
+    job = IngestJob(
+        id=uuid.uuid4().hex,
+        pokemon=list(pokemons),
+        concurrency=concurrency,
+        force=force,
+        requested_by=requested_by,
+        total=len(pokemons),
+    )
+    with users.get_session() as session:
+        session.add(job)
+        session.commit()
+        session.refresh(job)
+    worker_pool.notify()
+    return job
+
+
+def get_job(job_id):
+    with users.get_session() as session:
+        return session.get(IngestJob, job_id)
+
+
+def update_job(job_id, owned_by=None, **values):
+    """Update a job; with ``owned_by``, only while that worker still holds it.
+
+    Returns whether the job was updated.
+    """
+    stmt = update(IngestJob).where(IngestJob.id == job_id)
+    if owned_by is not None:
+        stmt = stmt.where(IngestJob.worker == owned_by)
+    with users.get_session() as session:
+        updated = session.execute(stmt.values(**values, updated_at=utcnow()))
+        session.commit()
+    return updated.rowcount == 1
+
+
+class Heartbeat:
+    """Thread refreshing ``updated_at`` of a running job, so slow batches or
+    long ``Retry-After`` waits do not make it look abandoned.
+    """
+
+    def __init__(self, job_id, worker_id, interval=None):
+        self.job_id = job_id
+        self.worker_id = worker_id
+        self.interval = interval or config.INGEST_JOB_HEARTBEAT_INTERVAL
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name=f"heartbeat-{job_id}", daemon=True
+        )
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            try:
+                if not update_job(self.job_id, owned_by=self.worker_id):
+                    return
+            except Exception as e:
+                log.error(f"Could not refresh ingest job {self.job_id} - {e}")
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stopped.set()
+        self._thread.join()
+
+
+def claim_next(worker_id):
+    """Atomically move the oldest queued job to running and return its id."""
+    with users.get_session() as session:
+        while True:
+            job_id = session.exec(
+                select(IngestJob.id)
+                .where(IngestJob.status == "queued")
+                .order_by(IngestJob.created_at)
+                .limit(1)
+            ).first()
+            if job_id is None:
+                return None
+            now = utcnow()
+            claimed = session.execute(
+                update(IngestJob)
+                .where(IngestJob.id == job_id, IngestJob.status == "queued")
+                .values(
+                    status="running", worker=worker_id, started_at=now, updated_at=now
+                )
+            )
+            session.commit()
+            if claimed.rowcount == 1:
+                return job_id
+
+
+def requeue_stale():
+    """Give jobs whose worker stopped reporting progress back to the queue."""
+    cutoff = utcnow() - timedelta(seconds=config.INGEST_JOB_STALE_SECONDS)
+    with users.get_session() as session:
+        requeued = session.execute(
+            update(IngestJob)
+            .where(IngestJob.status == "running", IngestJob.updated_at < cutoff)
+            .values(status="queued", worker=None, updated_at=utcnow())
+        )
+        session.commit()
+    if requeued.rowcount:
+        log.warning(f"Requeued {requeued.rowcount} stale ingest jobs")
+
+
+def run_job(job_id, worker_id=None):
+    """Run a claimed job, writing its progress while ``worker_id`` still holds it.
+
+    A worker whose job was requeued and claimed by another one stops at its
+    next progress update and never writes the final status.
+    """
+    job = get_job(job_id)
+    log.info(f"Running ingest job {job_id} with {job.total} pokemons")
+    results = []
+    timings = metrics.StageTimings()
+    started = time.perf_counter()
+    last_flush = started
+    try:
+        with (
+            Heartbeat(job_id, worker_id),
+            metrics.collect_timings(timings),
+            pokemon_api_client.PokemonAPIClient() as api,
+        ):
+            for status in pokemon_ingest.ingest_pokemons(
+                api, job.pokemon, job.concurrency, force=job.force
+            ):
+                status["elapsed"] = round(time.perf_counter() - started, 3)
+                results.append(status)
+                if time.perf_counter() - last_flush >= config.INGEST_PROGRESS_INTERVAL:
+                    if not update_job(
+                        job_id,
+                        owned_by=worker_id,
+                        results=list(results),
+                        processed=len(results),
+                        cache=dict(api.cache_stats),
+                        timings=timings.summary(),
+                    ):
+                        log.warning(
+                            f"Ingest job {job_id} was taken over by another "
+                            "worker, stopping"
+                        )
+                        return
+                    last_flush = time.perf_counter()
+            cache = dict(api.cache_stats)
+    except Exception as e:
+        log.error(f"Ingest job {job_id} failed - {e}")
+        update_job(
+            job_id,
+            owned_by=worker_id,
+            status="failed",
+            error=str(e),
+            results=results,
+            processed=len(results),
+            timings=timings.summary(),
+            finished_at=utcnow(),
+        )
+        return
+    if not update_job(
+        job_id,
+        owned_by=worker_id,
+        status="finished",
+        results=results,
+        processed=len(results),
+        cache=cache,
+        timings=timings.summary(),
+        finished_at=utcnow(),
+    ):
+        log.warning(f"Ingest job {job_id} was taken over by another worker")
+        return
+    log.info(f"Ingest job {job_id} finished in {time.perf_counter() - started:.2f}s")
+
+
+class IngestWorkerPool:
+    """Background threads that process queued ingest jobs from the database."""
+
+    def __init__(self, workers=None, poll_interval=None):
+        self.workers = config.INGEST_WORKERS if workers is None else workers
+        self.poll_interval = poll_interval or config.INGEST_POLL_INTERVAL
+        self._threads = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopped = threading.Event()
+
+    def start(self):
+        with self._lock:
+            if self._threads or self.workers <= 0:
+                return
+            self._stopped.clear()
+            for index in range(self.workers):
+                worker_id = f"{os.getpid()}-{index}"
+                thread = threading.Thread(
+                    target=self._run, args=(worker_id,), name=f"ingest-{worker_id}"
+                )
+                thread.daemon = True
+                thread.start()
+                self._threads.append(thread)
+            log.info(f"Started {self.workers} ingest workers")
+
+    def stop(self, timeout=None):
+        self._stopped.set()
+        self._wakeup.set()
+        for thread in self._threads:
+            thread.join(timeout)
+        self._threads = []
+
+    def notify(self):
+        self._wakeup.set()
+
+    def _run(self, worker_id):
+        while not self._stopped.is_set():
+            try:
+                job_id = claim_next(worker_id)
+                if job_id is None:
+                    requeue_stale()
+            except Exception as e:
+                log.error(f"Ingest worker {worker_id} could not poll the queue - {e}")
+                job_id = None
+            if job_id is None:
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+                continue
+            try:
+                run_job(job_id, worker_id)
+            except Exception as e:
+                log.error(f"Ingest worker {worker_id} crashed on job {job_id} - {e}")
+                update_job(
+                    job_id,
+                    owned_by=worker_id,
+                    status="failed",
+                    error=str(e),
+                    finished_at=utcnow(),
+                )
+
+
+worker_pool = IngestWorkerPool()
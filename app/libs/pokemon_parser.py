@@ -1,30 +1,107 @@
+from collections.abc import Mapping
+from commons import config
+from libs import metrics
 from libs import pokemon_api_sanitize as sanitizer
 
+PARSER_MODES = ("dict", "pandas")
+# Sanitizers of every entity. Each one is built with ``builder(data=payload)``
+# and provides ``build_df()`` and ``build_records()`` for a single payload, and
+# the classmethod ``build_batch_df(payloads)`` returning one DataFrame for the
+# entity across many payloads, with a ``pokemon_id`` column, for
+# ``parser_batch``.
+BUILDERS = {
+    "Pokemon": sanitizer.Pokemon,
+    "Species": sanitizer.Species,
+    "Abilities": sanitizer.Abilities,
+    "PokemonAbilities": sanitizer.PokemonAbilities,
+    "Cries": sanitizer.Cries,
+    "Type": sanitizer.Types,
+    "Forms": sanitizer.Forms,
+    "Moves": sanitizer.Moves,
+    "Pokemon Move Detail": sanitizer.MovesVersionDetails,
+    "Stat": sanitizer.Stats,
+    "Sprite": sanitizer.Sprite,
+}
+# Entities read by PokemonClientDB when writing a pokemon.
+PERSISTED_ENTITIES = (
+    "Pokemon",
+    "Species",
+    "PokemonAbilities",
+    "Cries",
+    "Type",
+    "Forms",
+    "Moves",
+    "Stat",
+)
 
-def parser_payload(data):
-    species = sanitizer.Species(data=data)
-    pokemon = sanitizer.Pokemon(data=data)
-    abilities = sanitizer.Abilities(data=data)
-    pokemon_abilities = sanitizer.PokemonAbilities(data=data)
-    cries = sanitizer.Cries(data=data)
-
-    move = sanitizer.Moves(data=data)
-    pokemon_move_detail = sanitizer.MovesVersionDetails(data=data)
-    stat = sanitizer.Stats(data=data)
-    type_ = sanitizer.Types(data=data)
-    sprite = sanitizer.Sprite(data=data)
-    forms = sanitizer.Forms(data=data)
-    response = {
-        "Pokemon": pokemon.build_df().to_dict(orient="records"),
-        "Species": species.build_df().to_dict(orient="records"),
-        "Abilities": abilities.build_df().to_dict(orient="records"),
-        "PokemonAbilities": pokemon_abilities.build_df().to_dict(orient="records"),
-        "Cries": cries.build_df().to_dict(orient="records"),
-        "Type": type_.build_df().to_dict(orient="records"),
-        "Forms": forms.build_df().to_dict(orient="records"),
-        "Moves": move.build_df().to_dict(orient="records"),
-        "Pokemon Move Detail": pokemon_move_detail.build_df().to_dict(orient="records"),
-        "Stat": stat.build_df().to_dict(orient="records"),
-        "Sprite": sprite.build_df().to_dict(orient="records"),
-    }
-    return response
+
+class ParsedPayload(Mapping):
+    """Parser output whose entities are only built when first accessed.
+
+    Callers that read a subset of the entities (like the DB writer) never pay
+    for the others; ``materialize()`` builds everything into a plain dict.
+    """
+
+    def __init__(self, builders, build):
+        self._builders = builders
+        self._build = build
+        self._entities = {}
+
+    def __getitem__(self, entity):
+        if entity not in self._entities:
+            self._entities[entity] = self._build(self._builders[entity])
+        return self._entities[entity]
+
+    def __iter__(self):
+        return iter(self._builders)
+
+    def __len__(self):
+        return len(self._builders)
+
+    def materialize(self):
+        return {entity: self[entity] for entity in self}
+
+
+def build_records(builder, mode):
+    with metrics.span(f"parse.{type(builder).__name__}"):
+        if mode == "pandas":
+            return builder.build_df().to_dict(orient="records")
+        return builder.build_records()
+
+
+def build_batch_df(builder, payloads):
+    with metrics.span(f"parse.{builder.__name__}"):
+        return builder.build_batch_df(payloads)
+
+
+def parser_payload(data, mode=None, full=False):
+    """Parse an API payload into records per entity.
+
+    ``mode`` selects how records are built: ``"dict"`` (default) walks the
+    payload directly and ``"pandas"`` goes through each sanitizer's DataFrame.
+    Both produce the same records. Entities are built lazily on access unless
+    ``full`` is set, in which case every entity is built up front and a dict
+    is returned.
+    """
+    mode = mode or config.PARSER_MODE
+    if mode not in PARSER_MODES:
+        raise ValueError(
+            f"Unknown parser mode {mode!r}, expected one of {PARSER_MODES}"
+        )
+    builders = {entity: builder(data=data) for entity, builder in BUILDERS.items()}
+    response = ParsedPayload(builders, lambda builder: build_records(builder, mode))
+    return response.materialize() if full else response
+
+
+def parser_batch(payloads, full=False):
+    """Parse many API payloads at once into one DataFrame per entity.
+
+    Every frame carries a ``pokemon_id`` column (``Pokemon`` uses ``id``), so
+    the result of a 1,000 pokemon ingest is a handful of vectorized frames
+    instead of one set of frames per pokemon. Frames are built lazily on
+    access unless ``full`` is set.
+    """
+    response = ParsedPayload(
+        BUILDERS, lambda builder: build_batch_df(builder, payloads)
+    )
+    return response.materialize() if full else response
@@ -0,0 +1,97 @@
+import threading
+from collections import OrderedDict
+
+from commons import config
+from libs.models import pokemon
+from loguru import logger as log
+from sqlmodel import select
+
+# Rows shared by many pokemons; everything else is written on every ingest.
+REFERENCE_MODELS = (
+    pokemon.Species,
+    pokemon.Ability,
+    pokemon.Type,
+    pokemon.Stat,
+    pokemon.Form,
+    pokemon.Move,
+)
+
+
+class ReferenceCache:
+    """Process-wide LRU of reference rows already persisted in the database.
+
+    Entries are keyed by ``(table, id)`` and hold the column values that were
+    written, so a reference whose name or url changed upstream is written
+    again. Rows are only added after the transaction that wrote them
+    committed.
+    """
+
+    def __init__(self, max_size=None):
+        self.max_size = config.REFERENCE_CACHE_SIZE if max_size is None else max_size
+        self.stats = {"hits": 0, "misses": 0, "evictions": 0}
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._warmed = False
+
+    def __len__(self):
+        return len(self._entries)
+
+    @staticmethod
+    def fingerprint(model, row):
+        return tuple(
+            (column.name, row[column.name])
+            for column in model.__table__.columns
+            if column.name in row
+        )
+
+    def unknown(self, model, rows):
+        """Rows of ``model`` that are not cached with the same values."""
+        if self.max_size <= 0:
+            return rows
+        missing = []
+        with self._lock:
+            for row in rows:
+                key = (model.__tablename__, row["id"])
+                if self._entries.get(key) == self.fingerprint(model, row):
+                    self._entries.move_to_end(key)
+                    self.stats["hits"] += 1
+                else:
+                    missing.append(row)
+                    self.stats["misses"] += 1
+        return missing
+
+    def add(self, model, rows):
+        if self.max_size <= 0:
+            return
+        with self._lock:
+            for row in rows:
+                key = (model.__tablename__, row["id"])
+                self._entries[key] = self.fingerprint(model, row)
+                self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.stats["evictions"] += 1
+
+    def warm(self, session):
+        """Load persisted reference rows, at most ``max_size`` of them, once."""
+        if self._warmed or self.max_size <= 0:
+            return
+        self._warmed = True
+        loaded = 0
+        for model in REFERENCE_MODELS:
+            limit = self.max_size - loaded
+            if limit <= 0:
+                break
+            rows = session.execute(select(model.__table__).limit(limit)).mappings()
+            rows = [dict(row) for row in rows]
+            self.add(model, rows)
+            loaded += len(rows)
+        log.info(f"Warmed the reference cache with {loaded} rows")
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._warmed = False
+
+
+reference_cache = ReferenceCache()
@@ -0,0 +1,156 @@
+import threading
+import time
+
+import numpy as np
+from commons import config
+from libs import pokemon_db_client
+from libs.models import users
+from loguru import logger as log
+
+GROUP_BY = ("type", "species")
+DEFAULT_PERCENTILES = (25, 50, 75)
+DEFAULT_BINS = 10
+MAX_CACHED_SUMMARIES = 256
+
+
+def summarize(values, percentiles=DEFAULT_PERCENTILES, bins=DEFAULT_BINS):
+    """Count, average, min, max, percentiles and histogram of an array of values."""
+    if values.size == 0:
+        return {
+            "count": 0,
+            "avg": None,
+            "min": None,
+            "max": None,
+            "percentiles": {},
+            "histogram": {"edges": [], "counts": []},
+        }
+    counts, edges = np.histogram(values, bins=bins)
+    return {
+        "count": int(values.size),
+        "avg": round(float(values.mean()), 3),
+        "min": int(values.min()),
+        "max": int(values.max()),
+        "percentiles": {
+            f"p{p:g}": round(float(value), 3)
+            for p, value in zip(percentiles, np.percentile(values, percentiles))
+        },
+        "histogram": {
+            "edges": [round(float(edge), 3) for edge in edges],
+            "counts": counts.tolist(),
+        },
+    }
+
+
+class StatsSnapshot:
+    """Columnar copy of every pokemon stat value, built from a single query.
+
+    Each stat keeps its pokemon ids (sorted), base values and species names
+    as NumPy arrays. Types live in separate ``(pokemon_id, type)`` arrays and
+    are matched to stat values with ``searchsorted``. ``lock`` (the owning
+    ``StatsCache`` lock) guards the summary cache that request threads share.
+    """
+
+    def __init__(self, rows, lock=None):
+        self.built_at = time.monotonic()
+        self.stats = {}
+        self._summaries = {}
+        self._lock = lock or threading.Lock()
+        type_links = sorted({(row[0], row[4]) for row in rows if row[4] is not None})
+        self.type_ids = np.array([link[0] for link in type_links], dtype=np.int64)
+        self.type_names = np.array([link[1] for link in type_links], dtype=object)
+        if not rows:
+            return
+        ids, names, values, species, _ = (np.asarray(c) for c in zip(*rows))
+        names = names.astype(object)
+        # Rows repeat once per type of their pokemon; keep the first of each run.
+        first = np.ones(ids.size, dtype=bool)
+        first[1:] = (ids[1:] != ids[:-1]) | (names[1:] != names[:-1])
+        ids, names, values = ids[first], names[first], values[first]
+        species = np.array([name or "" for name in species[first]], dtype=object)
+        for name in np.unique(names):
+            mask = names == name
+            self.stats[name] = (
+                ids[mask].astype(np.int64),
+                values[mask].astype(np.int64),
+                species[mask],
+            )
+
+    def labelled(self, stat, group_by):
+        """Values of ``stat`` and the ``group_by`` label of each of them."""
+        ids, values, species = self.stats[stat]
+        if group_by == "species":
+            return species, values
+        if ids.size == 0:
+            return self.type_names[:0], values
+        positions = np.minimum(np.searchsorted(ids, self.type_ids), ids.size - 1)
+        found = ids[positions] == self.type_ids
+        return self.type_names[found], values[positions[found]]
+
+    def summary(
+        self, stat, group_by=None, percentiles=DEFAULT_PERCENTILES, bins=DEFAULT_BINS
+    ):
+        """Summary of ``stat``, or one summary per type or species.
+
+        Raises ``KeyError`` for a stat that has no values.
+        """
+        key = (stat, group_by, tuple(percentiles), bins)
+        with self._lock:
+            if key in self._summaries:
+                return self._summaries[key]
+        if stat not in self.stats:
+            raise KeyError(stat)
+        if group_by is None:
+            result = summarize(self.stats[stat][1], percentiles, bins)
+        else:
+            labels, values = self.labelled(stat, group_by)
+            order = np.argsort(labels, kind="stable")
+            labels, values = labels[order], values[order]
+            groups, starts = np.unique(labels, return_index=True)
+            result = {
+                group: summarize(chunk, percentiles, bins)
+                for group, chunk in zip(groups, np.split(values, starts[1:]))
+                if group
+            }
+        with self._lock:
+            if len(self._summaries) >= MAX_CACHED_SUMMARIES:
+                self._summaries.clear()
+            self._summaries[key] = result
+        return result
+
+
+class StatsCache:
+    """Process-wide ``StatsSnapshot``, rebuilt after ingests or once it is ``ttl`` old."""
+
+    def __init__(self, ttl=None):
+        self.ttl = config.STATS_SNAPSHOT_TTL if ttl is None else ttl
+        self._snapshot = None
+        self._lock = threading.Lock()
+
+    def get(self):
+        with self._lock:
+            snapshot = self._snapshot
+            expired = (
+                snapshot is not None
+                and self.ttl > 0
+                and time.monotonic() - snapshot.built_at >= self.ttl
+            )
+            if snapshot is None or expired:
+                snapshot = self._snapshot = self.load()
+            return snapshot
+
+    def load(self):
+        started = time.perf_counter()
+        with users.get_session() as session:
+            db_client = pokemon_db_client.PokemonClientDB(session=session)
+            snapshot = StatsSnapshot(db_client.get_stat_values(), lock=self._lock)
+        log.info(
+            f"Built stats snapshot of {len(snapshot.stats)} stats "
+            f"in {time.perf_counter() - started:.3f}s"
+        )
+        return snapshot
+
+    def invalidate(self):
+        self._snapshot = None
+
+
+stats_cache = StatsCache()
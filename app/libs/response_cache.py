@@ -0,0 +1,224 @@
+import functools
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+
+from commons import config
+from flask import Response, make_response, request
+from loguru import logger as log
+
+
+class MemoryBackend:
+    """LRU of cached responses and table versions, local to the process.
+
+    Writes made by other processes (API workers, the CLI) do not bump these
+    versions, so their entries stay until they expire; use ``DiskBackend``
+    when several processes share the database.
+    """
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._versions = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def versions(self, tables):
+        with self._lock:
+            return {table: self._versions.get(table, 0) for table in tables}
+
+    def bump(self, tables):
+        with self._lock:
+            for table in tables:
+                self._versions[table] = self._versions.get(table, 0) + 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class DiskBackend:
+    """Cached responses and table versions in a directory shared by workers.
+
+    Every entry is one JSON file under ``entries/``; reads refresh its mtime
+    so the oldest files are evicted first once ``max_size`` is exceeded. Each
+    table version is a random token in ``versions/<table>``.
+    """
+
+    def __init__(self, directory, max_size):
+        self.directory = Path(directory)
+        self.max_size = max_size
+        (self.directory / "entries").mkdir(parents=True, exist_ok=True)
+        (self.directory / "versions").mkdir(parents=True, exist_ok=True)
+
+    def _entry_path(self, key):
+        name = hashlib.sha256(key.encode()).hexdigest()
+        return self.directory / "entries" / f"{name}.json"
+
+    def _write_atomic(self, path, data):
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as tmp:
+                tmp.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def get(self, key):
+        path = self._entry_path(key)
+        try:
+            entry = json.loads(path.read_text())
+            os.utime(path)
+        except (OSError, ValueError):
+            return None
+        return entry
+
+    def set(self, key, entry):
+        self._write_atomic(self._entry_path(key), json.dumps(entry).encode())
+        entries = list((self.directory / "entries").glob("*.json"))
+        if len(entries) <= self.max_size:
+            return
+        entries.sort(key=lambda path: path.stat().st_mtime)
+        for path in entries[: len(entries) - self.max_size]:
+            path.unlink(missing_ok=True)
+
+    def versions(self, tables):
+        versions = {}
+        for table in tables:
+            try:
+                versions[table] = (self.directory / "versions" / table).read_text()
+            except OSError:
+                versions[table] = ""
+        return versions
+
+    def bump(self, tables):
+        for table in tables:
+            self._write_atomic(
+                self.directory / "versions" / table, uuid.uuid4().hex.encode()
+            )
+
+    def clear(self):
+        for path in (self.directory / "entries").glob("*.json"):
+            path.unlink(missing_ok=True)
+
+
+class ResponseCache:
+    """Read-through cache of GET responses keyed by path and query arguments.
+
+    Each cached view declares the tables it reads. An entry remembers the
+    versions of those tables when it was stored and is ignored once the
+    ingest bumps one of them, or after ``ttl`` seconds.
+    """
+
+    def __init__(self, ttl=None, max_size=None, directory=None):
+        self.ttl = config.RESPONSE_CACHE_TTL if ttl is None else ttl
+        max_size = config.RESPONSE_CACHE_SIZE if max_size is None else max_size
+        directory = config.RESPONSE_CACHE_DIR if directory is None else directory
+        if directory:
+            self.backend = DiskBackend(directory, max_size)
+        else:
+            self.backend = MemoryBackend(max_size)
+        self.stats = {"hits": 0, "misses": 0}
+        self._stats_lock = threading.Lock()
+
+    @staticmethod
+    def request_key():
+        args = sorted(request.args.items(multi=True))
+        return f"{request.path}?{json.dumps(args)}"
+
+    def invalidate(self, tables):
+        tables = sorted(set(tables))
+        if tables:
+            self.backend.bump(tables)
+            log.debug(f"Invalidated cached responses reading {tables}")
+
+    def lookup(self, key, versions):
+        entry = self.backend.get(key)
+        if (
+            entry is None
+            or entry["expires_at"] < time.time()
+            or entry["versions"] != versions
+        ):
+            self.count("misses")
+            return None
+        self.count("hits")
+        return entry
+
+    def count(self, stat):
+        with self._stats_lock:
+            self.stats[stat] += 1
+
+    def store(self, key, versions, response):
+        self.backend.set(
+            key,
+            {
+                "expires_at": time.time() + self.ttl,
+                "versions": versions,
+                "status": response.status_code,
+                "mimetype": response.mimetype,
+                "headers": {
+                    name: value
+                    for name, value in response.headers.items()
+                    if name.startswith("X-")
+                },
+                "body": response.get_data(as_text=True),
+            },
+        )
+
+    def cached(self, *tables):
+        """Decorate a GET view so its 200 responses are served from the cache.
+
+        Streaming (``stream=true``) requests are never cached.
+        """
+
+        def decorator(view):
+            @functools.wraps(view)
+            def wrapper(*args, **kwargs):
+                if self.ttl <= 0 or request.args.get("stream", "").lower() == "true":
+                    return view(*args, **kwargs)
+                key = self.request_key()
+                # Versions are read before the view runs, so an ingest that
+                # commits meanwhile leaves the stored entry already stale.
+                versions = self.backend.versions(tables)
+                entry = self.lookup(key, versions)
+                if entry is not None:
+                    response = Response(
+                        entry["body"],
+                        status=entry["status"],
+                        mimetype=entry["mimetype"],
+                        headers=entry["headers"],
+                    )
+                    response.headers["X-Cache"] = "HIT"
+                    return response
+                response = make_response(view(*args, **kwargs))
+                if response.status_code == 200 and not response.is_streamed:
+                    self.store(key, versions, response)
+                response.headers["X-Cache"] = "MISS"
+                return response
+
+            return wrapper
+
+        return decorator
+
+
+response_cache = ResponseCache()
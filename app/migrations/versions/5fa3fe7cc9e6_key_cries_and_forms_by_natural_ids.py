@@ -0,0 +1,71 @@
+"""Key cries and forms by natural ids
+
+Revision ID: 5fa3fe7cc9e6
+Revises: 479a565b09fc
+Create Date: 2026-10-18 12:51:47.419130
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+import re
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5fa3fe7cc9e6'
+down_revision: Union[str, None] = '479a565b09fc'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+cries = sa.table('cries', sa.column('id', sa.Integer), sa.column('latest', sa.String), sa.column('legacy', sa.String))
+pokemoncry = sa.table('pokemoncry', sa.column('pokemon_id', sa.Integer), sa.column('cry_id', sa.Integer))
+form = sa.table('form', sa.column('id', sa.Integer), sa.column('name', sa.String), sa.column('url', sa.String))
+pokemonform = sa.table('pokemonform', sa.column('pokemon_id', sa.Integer), sa.column('form_id', sa.Integer))
+
+
+def form_id(url):
+    match = re.search(r"/(\d+)/$", url or "")
+    return int(match.group(1)) if match else None
+
+
+def upgrade() -> None:
+    # Cries and forms used to get autoincrement ids; the ingest now keys a cry
+    # by its pokemon id and a form by the id in its API url. Rebuild both
+    # tables and their links with those ids, so an upsert can't overwrite
+    # another pokemon's row. Unlinked rows are dropped.
+    bind = op.get_bind()
+    cry_rows = {}
+    for pokemon_id, _, latest, legacy in bind.execute(
+        sa.select(pokemoncry.c.pokemon_id, cries.c.id, cries.c.latest, cries.c.legacy)
+        .join(cries, cries.c.id == pokemoncry.c.cry_id)
+        .order_by(pokemoncry.c.pokemon_id, cries.c.id)
+    ):
+        # Re-ingests used to add a cry per ingest; the newest one wins.
+        cry_rows[pokemon_id] = {'id': pokemon_id, 'latest': latest, 'legacy': legacy}
+    form_rows = {}
+    form_links = set()
+    for pokemon_id, old_id, name, url in bind.execute(
+        sa.select(pokemonform.c.pokemon_id, form.c.id, form.c.name, form.c.url)
+        .join(form, form.c.id == pokemonform.c.form_id)
+    ):
+        new_id = form_id(url) or old_id
+        form_rows[new_id] = {'id': new_id, 'name': name, 'url': url}
+        form_links.add((pokemon_id, new_id))
+
+    op.execute(pokemoncry.delete())
+    op.execute(cries.delete())
+    op.execute(pokemonform.delete())
+    op.execute(form.delete())
+    if cry_rows:
+        op.bulk_insert(cries, list(cry_rows.values()))
+        op.bulk_insert(pokemoncry, [{'pokemon_id': key, 'cry_id': key} for key in cry_rows])
+    if form_rows:
+        op.bulk_insert(form, list(form_rows.values()))
+        op.bulk_insert(pokemonform, [{'pokemon_id': pokemon_id, 'form_id': key} for pokemon_id, key in sorted(form_links)])
+
+
+def downgrade() -> None:
+    # The natural ids are valid surrogate ids as well.
+    pass
@@ -1,8 +1,9 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
 from sqlmodel import select
-from libs.models.users import User, get_session
-from passlib.hash import pbkdf2_sha256
+from libs.auth_cache import credential_cache, login_rate_limiter
+from libs.models.users import User, get_session, password_hasher
+from loguru import logger as log
 
 auth_bp = Blueprint("auth", __name__)
 
@@ -60,7 +61,7 @@ def register():
     username = data.get("username")
     password = data.get("password")
     with get_session() as session:
-        user = User(username=username, password=pbkdf2_sha256.hash(password))
+        user = User(username=username, password=password_hasher.hash(password))
         exists = session.exec(select(User).where(User.username == username)).first()
         if exists:
             return jsonify(message="User already exists"), 400
@@ -81,6 +82,7 @@ def login():
       This endpoint authenticates a user by verifying the provided username and password.
       If the credentials are valid, a JWT access token is generated and returned.
       Otherwise, an error message is returned.
+      Failed attempts per username and client address are limited to LOGIN_RATE_LIMIT per LOGIN_RATE_WINDOW seconds, and passwords hashed with fewer than PASSWORD_HASH_ROUNDS rounds are rehashed on a successful login.
     consumes:
       - application/json
     produces:
@@ -119,13 +121,32 @@ def login():
             message:
               type: string
               description: Error message indicating that the login credentials are invalid.
+      429:
+        description: Too many failed login attempts for this username from this address; retry after the Retry-After header seconds.
     """
     data = request.json
+    username, password = data["username"], data["password"]
+    rate_key = (username, request.remote_addr)
+    retry_after = login_rate_limiter.retry_after(rate_key)
+    if retry_after:
+        response = jsonify(message="Too many login attempts")
+        response.headers["Retry-After"] = str(int(retry_after) + 1)
+        return response, 429
     with get_session() as session:
-        user = session.exec(
-            select(User).where(User.username == data["username"])
-        ).first()
-        if user and user.check_password(data["password"]):
-            access_token = create_access_token(identity=user.id)
-            return jsonify(access_token=access_token)
-        return jsonify(message="Invalid credentials"), 401
+        user = session.exec(select(User).where(User.username == username)).first()
+        if user is None:
+            login_rate_limiter.fail(rate_key)
+            return jsonify(message="Invalid credentials"), 401
+        if not credential_cache.is_verified(username, password, user.hashed_password):
+            if not user.check_password(password):
+                login_rate_limiter.fail(rate_key)
+                return jsonify(message="Invalid credentials"), 401
+            if user.needs_rehash():
+                log.info(f"Rehashing the password of user {user.id}")
+                user.hashed_password = password_hasher.hash(password)
+                session.add(user)
+                session.commit()
+            credential_cache.add(username, password, user.hashed_password)
+        login_rate_limiter.reset(rate_key)
+        access_token = create_access_token(identity=user.id)
+        return jsonify(access_token=access_token)
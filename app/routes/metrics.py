@@ -0,0 +1,23 @@
+from flask import Blueprint, Response
+from libs import metrics
+
+metrics_bp = Blueprint("metrics", __name__)
+
+
+@metrics_bp.route("/metrics", methods=["GET"])
+def get_metrics():
+    """
+    Prometheus metrics
+    ---
+    tags:
+      - Metrics
+    summary: Expose application metrics in the Prometheus text format
+    description: >
+      Database pool metrics: seconds spent waiting for a pooled connection, connections currently checked out and the configured pool size.
+    produces:
+      - text/plain
+    responses:
+      200:
+        description: Metrics in the Prometheus text exposition format.
+    """
+    return Response(metrics.registry.render(), mimetype="text/plain; version=0.0.4")
@@ -1,16 +1,51 @@
-from flask import Blueprint, request, jsonify
+import json
+
+from flask import Blueprint, Response, request, jsonify, stream_with_context, url_for
 from flask_jwt_extended import create_access_token, jwt_required, get_jwt_identity
 from sqlmodel import select
+from libs import metrics
 from libs import pokemon_api_client
 from libs import pokemon_db_client
+from libs import pokemon_ingest
+from libs import pokemon_job_queue
+from libs import pokemon_stats
 from libs.models import users
-from libs import pokemon_parser as parser
+from libs.response_cache import response_cache
 from loguru import logger as log
-import httpx
 
 pokemon_bp = Blueprint("scrape", __name__)
 
 
+def page_args():
+    """Read the ``after_id``/``limit``/``stream`` keyset pagination arguments."""
+    after_id = request.args.get("after_id", type=int)
+    limit = request.args.get("limit", type=int)
+    stream = request.args.get("stream", "false").lower() == "true"
+    if limit is not None and limit <= 0:
+        limit = None
+    return after_id, limit, stream
+
+
+def page_response(rows, limit):
+    """JSON array response with ``X-Next-Cursor`` set when another page may follow."""
+    response = jsonify(rows)
+    if limit is not None and len(rows) == limit:
+        response.headers["X-Next-Cursor"] = str(rows[-1]["id"])
+    return response
+
+
+def ndjson_response(query):
+    """Stream the rows yielded by ``query(db_client)`` as newline-delimited JSON."""
+
+    def generate():
+        with users.get_session() as session:
+            db_client = pokemon_db_client.PokemonClientDB(session=session)
+            for row in query(db_client):
+                yield json.dumps(row, sort_keys=True) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+
 @pokemon_bp.route("/pokemon/collect", methods=["POST"])
 @jwt_required()
 def fetch_data():
@@ -23,6 +58,10 @@ def fetch_data():
     description: >
       This endpoint ingests Pokemon data into the database. It accepts a JSON payload containing a list of Pokemon names or IDs under the key "pokemon".
       For each provided Pokemon, it fetches data from an external Pokemon API, parses the data, and inserts multiple related records (Species, Pokemon, Abilities, Cries, Type, Stats, Forms, Moves) into the database.
+      By default the request is stored as an ingest job, processed by background workers, and the endpoint answers immediately with the job id; poll /pokemon/collect/{job_id} for progress.
+      With sync=true the ingestion runs inside the request and the results are returned directly.
+      Pokemon payloads are fetched concurrently, bounded by the "concurrency" field or the FETCH_CONCURRENCY setting.
+      Pokemon whose payload is identical to the last ingested one are reported as "unchanged" and not written again.
       If an error occurs during data fetching, the endpoint records the error for that Pokemon and continues processing the rest.
     security:
       - Bearer: []
@@ -31,6 +70,12 @@ def fetch_data():
     produces:
       - application/json
     parameters:
+      - in: query
+        name: sync
+        type: boolean
+        required: false
+        default: false
+        description: Run the ingestion inside the request instead of queueing a job.
       - in: body
         name: body
         description: JSON payload containing list of Pokemon to ingest.
@@ -45,78 +90,187 @@ def fetch_data():
               items:
                 type: string
               description: List of Pokemon names or IDs to be ingested.
+            concurrency:
+              type: integer
+              description: Maximum number of concurrent requests to the Pokemon API (defaults to FETCH_CONCURRENCY).
+            force:
+              type: boolean
+              description: Rewrite Pokemon whose payload did not change since the last ingest (default false).
     responses:
+      202:
+        description: The ingest job was queued.
+        schema:
+          type: object
+          properties:
+            job_id:
+              type: string
+              description: Identifier of the ingest job.
+            status:
+              type: string
+              description: Job status ("queued").
+            status_url:
+              type: string
+              description: URL to poll for the job progress.
       200:
-        description: A list of ingestion results for each Pokemon.
+        description: (sync=true) Ingestion results for each Pokemon and payload cache counters.
         schema:
-          type: array
-          items:
-            type: object
-            properties:
-              pokemon:
-                type: string
-                description: The Pokemon identifier that was processed.
-              status:
-                type: string
-                description: Ingestion status for the Pokemon (e.g., "ingested", "error").
+          type: object
+          properties:
+            results:
+              type: array
+              items:
+                type: object
+                properties:
+                  pokemon:
+                    type: string
+                    description: The Pokemon identifier that was processed.
+                  status:
+                    type: string
+                    description: Ingestion status for the Pokemon ("ingested", "unchanged" or "error").
+            cache:
+              type: object
+              description: Payload cache usage for this request.
+              properties:
+                hits:
+                  type: integer
+                  description: Payloads served from a fresh cache entry without any network call.
+                revalidated:
+                  type: integer
+                  description: Cached payloads confirmed unchanged by a 304 Not Modified response.
+                misses:
+                  type: integer
+                  description: Payloads downloaded from the Pokemon API.
+            timings:
+              type: object
+              description: >
+                Per-stage summary keyed by stage name ("fetch", "diff", "parse.<Sanitizer>", "write.<table>", "write.aggregates", "write.commit"),
+                each with the number of calls, total seconds and database statements.
+      400:
+        description: The "pokemon" list was not provided.
     """
+    data = request.get_json()
+    pokemons = data.get("pokemon")
+    concurrency = data.get("concurrency")
+    force = bool(data.get("force", False))
+    if not isinstance(pokemons, list):
+        return jsonify({"error": "pokemon list not provided"}), 400
+
+    if request.args.get("sync", "false").lower() != "true":
+        job = pokemon_job_queue.enqueue(
+            pokemons, concurrency, requested_by=str(get_jwt_identity()), force=force
+        )
+        log.info(f"Queued ingest job {job.id} with {job.total} pokemons")
+        status_url = url_for(".get_collect_job", job_id=job.id)
+        return (
+            jsonify({"job_id": job.id, "status": job.status, "status_url": status_url}),
+            202,
+        )
+
+    response_pokemon_data = []
+    cache_stats = {}
+    timings = metrics.StageTimings()
     try:
         log.info("Ingesting Pokemon data into the Database")
-        api = pokemon_api_client.PokemonAPIClient()
-        data = request.get_json()
-        pokemons = data.get("pokemon")
-
-        response_pokemon_data = []
-        for pokemon in pokemons:
-            try:
-                log.info(f"Fetching pokemon {pokemon}")
-                result = api.get_pokemon(pokemon)
-            except httpx.HTTPStatusError as e:
-                log.error(f"Error fetching pokemon {pokemon} - {e}")
-                response_pokemon_data.append({"pokemon": pokemon, "status": "error"})
-                continue
-            log.info("Parsing pokemon data")
-            pokemon_parser_original = parser.parser_payload(result)
-            with users.get_session() as session:
-                log.info(f"Preparing parsed data for {pokemon}")
-                pokemon_parser = pokemon_parser_original
-                log.info("Creating database object")
-                db_client = pokemon_db_client.PokemonClientDB(session=session)
-                log.info("Inserting Species into database")
-                species_data = db_client.create_species(pokemon_parser["Species"])
-                log.info(species_data.id)
-                pokemon_parser["Pokemon"][0]["species_id"] = species_data.id
-                log.info("Creating Pokemon")
-                pokemon_data = db_client.create_pokemon(pokemon_parser["Pokemon"])
-                log.info(f"Pokemon created with Id  {pokemon_data.id}")
-                log.info("Creating Abilities")
-                ability_data = db_client.create_ability(
-                    pokemon_parser["PokemonAbilities"]
-                )
-                log.warning(ability_data)
-                log.info("Creating Cries")
-                db_client.create_cries(pokemon_parser["Cries"])
-                log.info("Creating Type")
-                db_client.create_type(pokemon_parser["Type"])
-                log.info("Creating Stats")
-                # Create stats
-                db_client.create_stat(pokemon_parser["Stat"])
-                # Create Forms
-                log.info("Creating Forms")
-                db_client.create_forms(pokemon_parser["Forms"])
-                # Create Moves
-                log.info("Creating Moves")
-                db_client.create_moves(pokemon_parser["Moves"])
-
-            response_pokemon_data.append({"pokemon": pokemon, "status": "ingested"})
+        log.info(f"Fetching {len(pokemons)} pokemons")
+        with metrics.collect_timings(timings):
+            with pokemon_api_client.PokemonAPIClient() as api:
+                cache_stats = api.cache_stats
+                for status in pokemon_ingest.ingest_pokemons(
+                    api, pokemons, concurrency, force=force
+                ):
+                    response_pokemon_data.append(status)
     except Exception as e:
-        log.error(f"Error using the API {pokemon} - {e}")
+        log.error(f"Error using the API - {e}")
     finally:
-        return jsonify(response_pokemon_data)
+        return jsonify(
+            {
+                "results": response_pokemon_data,
+                "cache": cache_stats,
+                "timings": timings.summary(),
+            }
+        )
+
+
+@pokemon_bp.route("/pokemon/collect/<job_id>", methods=["GET"])
+@jwt_required()
+def get_collect_job(job_id):
+    """
+    Retrieve the progress of an ingest job
+    ---
+    tags:
+      - Pokemon
+    summary: Ingest job status
+    description: >
+      This endpoint returns the status of an ingest job created by POST /pokemon/collect,
+      including how many Pokemon were processed so far, the per-Pokemon status and the job timings.
+    security:
+      - Bearer: []
+    produces:
+      - application/json
+    parameters:
+      - in: path
+        name: job_id
+        type: string
+        required: true
+        description: Identifier returned when the job was queued.
+    responses:
+      200:
+        description: The ingest job.
+        schema:
+          type: object
+          properties:
+            job_id:
+              type: string
+            status:
+              type: string
+              description: One of "queued", "running", "finished" or "failed".
+            total:
+              type: integer
+              description: Number of Pokemon requested.
+            processed:
+              type: integer
+              description: Number of Pokemon processed so far.
+            results:
+              type: array
+              items:
+                type: object
+                properties:
+                  pokemon:
+                    type: string
+                  status:
+                    type: string
+                  elapsed:
+                    type: number
+                    description: Seconds since the job started when this Pokemon was done.
+            cache:
+              type: object
+              description: Payload cache counters of the job.
+            error:
+              type: string
+            created_at:
+              type: string
+            started_at:
+              type: string
+            finished_at:
+              type: string
+            queued_seconds:
+              type: number
+              description: Time the job waited for a worker.
+            run_seconds:
+              type: number
+              description: Time the job has been (or was) running.
+      404:
+        description: Job not found.
+    """
+    job = pokemon_job_queue.get_job(job_id)
+    if job is None:
+        return jsonify({"error": "Job not found"}), 404
+    return jsonify(job.to_dict())
 
 
 @pokemon_bp.route("/pokemon", methods=["GET"])
 @jwt_required()
+@response_cache.cached("pokemon", "pokemontype", "type")
 def get_pokemon_by_type():
     """
     Retrieve Pokemon by type
@@ -127,19 +281,41 @@ def get_pokemon_by_type():
     description: >
       This endpoint retrieves a list of Pokemon from the database that match the provided type.
       The type should be supplied as a query parameter. If the parameter is missing, an error is returned.
+      Use after_id and limit to page through the results by pokemon id, or stream=true to receive every row as newline-delimited JSON.
     security:
       - Bearer: []
     produces:
       - application/json
+      - application/x-ndjson
     parameters:
       - in: query
         name: type
         type: string
         required: true
         description: The type of Pokemon to filter by.
+      - in: query
+        name: after_id
+        type: integer
+        required: false
+        description: Keyset cursor; only Pokemon with a greater id are returned, ordered by id. Use the X-Next-Cursor header of the previous page.
+      - in: query
+        name: limit
+        type: integer
+        required: false
+        description: Page size. When set, results are ordered by id and X-Next-Cursor is returned if another page may follow.
+      - in: query
+        name: stream
+        type: boolean
+        required: false
+        default: false
+        description: Stream every matching row as newline-delimited JSON (application/x-ndjson) instead of a JSON array.
     responses:
       200:
         description: A list of Pokemon objects matching the specified type.
+        headers:
+          X-Next-Cursor:
+            type: integer
+            description: Value of after_id for the next page, present when the page is full.
         schema:
           type: array
           items:
@@ -162,21 +338,184 @@ def get_pokemon_by_type():
               description: Error message indicating that the type parameter is required.
     """
     type_filter = request.args.get("type")
+    after_id, limit, stream = page_args()
+    if stream and type_filter:
+        log.info(f"Streaming pokemon by type {type_filter}")
+        return ndjson_response(
+            lambda db_client: db_client.stream_pokemon_by_type(
+                type_filter, after_id, limit
+            )
+        )
     with users.get_session() as session:
         db_client = pokemon_db_client.PokemonClientDB(session=session)
         if type_filter:
             log.info(f"Getting pokemon by type {type_filter}")
-            result = db_client.get_pokemon_by_type(type_filter)
+            result = db_client.get_pokemon_by_type(type_filter, after_id, limit)
         else:
             return jsonify({"error": "Type not provided"}), 400
 
         log.debug(result)
-        pokemons = [pokemon.dict() for pokemon in result]
-        return jsonify(pokemons)
+        pokemons = [pokemon.dict(exclude={"payload_hash"}) for pokemon in result]
+        return page_response(pokemons, limit)
+
+
+def full_pokemon(pokemon):
+    """Serialize a pokemon loaded by ``get_full_pokemons`` with its relationships."""
+    cry = pokemon.cries.cry if pokemon.cries else None
+    return {
+        **pokemon.dict(exclude={"payload_hash"}),
+        "species": pokemon.species.dict() if pokemon.species else None,
+        "abilities": [
+            {
+                "id": link.ability_id,
+                "name": link.ability.name,
+                "is_hidden": link.is_hidden,
+                "slot": link.slot,
+            }
+            for link in pokemon.abilities
+        ],
+        "cries": {"latest": cry.latest, "legacy": cry.legacy} if cry else None,
+        "moves": [
+            {"id": link.move_id, "name": link.move.name} for link in pokemon.moves
+        ],
+        "stats": [
+            {
+                "id": link.stat_id,
+                "name": link.stat.name,
+                "base_stat": link.base_stat,
+                "effort": link.effort,
+            }
+            for link in pokemon.stats
+        ],
+        "types": [
+            {"id": link.type_id, "name": link.type.name, "slot": link.slot}
+            for link in pokemon.types
+        ],
+        "forms": [{"id": form.id, "name": form.name} for form in pokemon.forms],
+    }
+
+
+@pokemon_bp.route("/pokemon/full", methods=["GET"])
+@jwt_required()
+@response_cache.cached(
+    "pokemon",
+    "species",
+    "pokemonability",
+    "ability",
+    "pokemoncry",
+    "cries",
+    "pokemon_move",
+    "move",
+    "pokemonstat",
+    "stat",
+    "pokemontype",
+    "type",
+    "pokemonform",
+    "form",
+)
+def get_full_pokemons():
+    """
+    Retrieve Pokemon with all their relationships
+    ---
+    tags:
+      - Pokemon
+    summary: Retrieve full Pokemon records by id, name or type
+    description: >
+      This endpoint returns Pokemon together with their species, abilities, cries, moves, stats, types and forms.
+      At least one of id, name or type is required. Relationships are loaded eagerly, so the number of database queries does not grow with the number of Pokemon returned.
+      Use after_id and limit to page through the results by pokemon id.
+    security:
+      - Bearer: []
+    produces:
+      - application/json
+    parameters:
+      - in: query
+        name: id
+        type: integer
+        required: false
+        description: The Pokemon id.
+      - in: query
+        name: name
+        type: string
+        required: false
+        description: The Pokemon name.
+      - in: query
+        name: type
+        type: string
+        required: false
+        description: The type of Pokemon to filter by.
+      - in: query
+        name: after_id
+        type: integer
+        required: false
+        description: Keyset cursor; only Pokemon with a greater id are returned. Use the X-Next-Cursor header of the previous page.
+      - in: query
+        name: limit
+        type: integer
+        required: false
+        description: Page size. X-Next-Cursor is returned if another page may follow.
+    responses:
+      200:
+        description: >
+          A list of Pokemon objects with nested "species", "abilities", "cries", "moves", "stats", "types" and "forms".
+        headers:
+          X-Next-Cursor:
+            type: integer
+            description: Value of after_id for the next page, present when the page is full.
+        schema:
+          type: array
+          items:
+            type: object
+            properties:
+              id:
+                type: integer
+              name:
+                type: string
+              species:
+                type: object
+              abilities:
+                type: array
+                items:
+                  type: object
+              cries:
+                type: object
+              moves:
+                type: array
+                items:
+                  type: object
+              stats:
+                type: array
+                items:
+                  type: object
+              types:
+                type: array
+                items:
+                  type: object
+              forms:
+                type: array
+                items:
+                  type: object
+      400:
+        description: None of id, name or type provided
+    """
+    pokemon_id = request.args.get("id", type=int)
+    name = request.args.get("name")
+    type_filter = request.args.get("type")
+    after_id, limit, _ = page_args()
+    if pokemon_id is None and not name and not type_filter:
+        return jsonify({"error": "Provide id, name or type"}), 400
+    with users.get_session() as session:
+        db_client = pokemon_db_client.PokemonClientDB(session=session)
+        result = db_client.get_full_pokemons(
+            pokemon_id, name or None, type_filter or None, after_id, limit
+        )
+        pokemons = [full_pokemon(pokemon) for pokemon in result]
+        return page_response(pokemons, limit)
 
 
 @pokemon_bp.route("/pokemon/top", methods=["GET"])
 @jwt_required()
+@response_cache.cached("pokemon")
 def get_top_pokemons():
     """
     Retrieve top pokemons based on order and limit
@@ -228,43 +567,53 @@ def get_top_pokemons():
         db_client = pokemon_db_client.PokemonClientDB(session=session)
         result = db_client.get_top_pokemons(limit, order_by)
         log.debug(result)
-        pokemons = [pokemon.dict() for pokemon in result]
+        pokemons = [pokemon.dict(exclude={"payload_hash"}) for pokemon in result]
         return jsonify(pokemons)
 
 
 #
 @pokemon_bp.route("/pokemon/with-species", methods=["GET"])
 @jwt_required()
+@response_cache.cached("pokemon", "species")
 def get_pokemon_by_species():
     """
-    Retrieve top pokemons based on order and limit
+    Retrieve pokemons with their species
     ---
     tags:
       - Pokemon
-    summary: Retrieve top pokemons
+    summary: Retrieve pokemons with their species
     description: >
-      This endpoint retrieves the top pokemons from the database based on the specified ordering and limit.
-      The default limit is 10 and the default ordering is by base_experience in descending order.
+      This endpoint retrieves every pokemon joined with its species.
+      Use after_id and limit to page through the results by pokemon id, or stream=true to receive every row as newline-delimited JSON.
     security:
       - Bearer: []
     produces:
       - application/json
+      - application/x-ndjson
     parameters:
+      - in: query
+        name: after_id
+        type: integer
+        required: false
+        description: Keyset cursor; only Pokemon with a greater id are returned, ordered by id. Use the X-Next-Cursor header of the previous page.
       - in: query
         name: limit
         type: integer
         required: false
-        default: 10
-        description: The maximum number of pokemons to return.
+        description: Page size. When set, results are ordered by id and X-Next-Cursor is returned if another page may follow.
       - in: query
-        name: order_by
-        type: string
+        name: stream
+        type: boolean
         required: false
-        default: base_experience_desc
-        description: The field and order to sort pokemons by (e.g., "base_experience_desc").
+        default: false
+        description: Stream every matching row as newline-delimited JSON (application/x-ndjson) instead of a JSON array.
     responses:
       200:
-        description: A list of top pokemons.
+        description: A list of pokemons with their species.
+        headers:
+          X-Next-Cursor:
+            type: integer
+            description: Value of after_id for the next page, present when the page is full.
         schema:
           type: array
           items:
@@ -276,13 +625,21 @@ def get_pokemon_by_species():
               name:
                 type: string
                 description: The name of the pokemon.
-              base_experience:
+              species:
+                type: string
+                description: The name of the species.
+              species_id:
                 type: integer
-                description: The base experience of the pokemon.
+                description: The unique identifier of the species.
     """
+    after_id, limit, stream = page_args()
+    if stream:
+        return ndjson_response(
+            lambda db_client: db_client.stream_pokemons_by_species(after_id, limit)
+        )
     with users.get_session() as session:
         db_client = pokemon_db_client.PokemonClientDB(session=session)
-        result = db_client.get_pokemons_by_species()
+        result = db_client.get_pokemons_by_species(after_id, limit)
         log.debug(result)
         pokemons = [
             {
@@ -293,11 +650,12 @@ def get_pokemon_by_species():
             }
             for pokemon, species in result
         ]
-        return jsonify(pokemons)
+        return page_response(pokemons, limit)
 
 
 @pokemon_bp.route("/types/pokemon-count", methods=["GET"])
 @jwt_required()
+@response_cache.cached("type_count")
 def get_types_pokemon_count():
     """
     Get pokemon count by type
@@ -342,6 +700,7 @@ def get_types_pokemon_count():
 
 @pokemon_bp.route("/stats/hp/average", methods=["GET"])
 @jwt_required()
+@response_cache.cached("stat_aggregate")
 def get_hp_average():
     """
     Retrieve average HP of pokemons
@@ -374,3 +733,91 @@ def get_hp_average():
         data = [{"average_hp": result}]
 
         return jsonify(data)
+
+
+@pokemon_bp.route("/stats/<stat_name>/summary", methods=["GET"])
+@jwt_required()
+def get_stat_summary(stat_name):
+    """
+    Summarize a base stat
+    ---
+    tags:
+      - Pokemon
+    summary: Average, min, max, percentiles and histogram of a base stat
+    description: >
+      This endpoint summarizes the base values of any stat (hp, attack, defense, special-attack, special-defense, speed), optionally once per type or species.
+      It is served from an in-memory snapshot of the stat values that is rebuilt after ingests and every STATS_SNAPSHOT_TTL seconds.
+    security:
+      - Bearer: []
+    produces:
+      - application/json
+    parameters:
+      - in: path
+        name: stat_name
+        type: string
+        required: true
+        description: The stat to summarize (e.g., "attack").
+      - in: query
+        name: group_by
+        type: string
+        required: false
+        enum: [type, species]
+        description: Return one summary per type or per species.
+      - in: query
+        name: percentiles
+        type: string
+        required: false
+        default: "25,50,75"
+        description: Comma separated percentiles between 0 and 100.
+      - in: query
+        name: bins
+        type: integer
+        required: false
+        default: 10
+        description: Number of histogram bins (1 to 100).
+    responses:
+      200:
+        description: >
+          The stat summary (count, avg, min, max, percentiles and histogram edges/counts).
+          With group_by the "groups" object maps each type or species name to its summary.
+        schema:
+          type: object
+          properties:
+            stat:
+              type: string
+            group_by:
+              type: string
+            summary:
+              type: object
+            groups:
+              type: object
+      400:
+        description: Invalid group_by, percentiles or bins
+      404:
+        description: No values stored for the stat
+    """
+    group_by = request.args.get("group_by")
+    bins = request.args.get("bins", pokemon_stats.DEFAULT_BINS, type=int)
+    try:
+        percentiles = [
+            float(p)
+            for p in request.args.get("percentiles", "25,50,75").split(",")
+            if p.strip()
+        ]
+    except ValueError:
+        percentiles = None
+    if group_by is not None and group_by not in pokemon_stats.GROUP_BY:
+        return jsonify({"error": "group_by must be type or species"}), 400
+    if not percentiles or not all(0 <= p <= 100 for p in percentiles):
+        return jsonify({"error": "percentiles must be between 0 and 100"}), 400
+    if not 1 <= bins <= 100:
+        return jsonify({"error": "bins must be between 1 and 100"}), 400
+
+    snapshot = pokemon_stats.stats_cache.get()
+    try:
+        result = snapshot.summary(stat_name, group_by, percentiles, bins)
+    except KeyError:
+        return jsonify({"error": "Stat not found"}), 404
+    if group_by is None:
+        return jsonify({"stat": stat_name, "summary": result})
+    return jsonify({"stat": stat_name, "group_by": group_by, "groups": result})
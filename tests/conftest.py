@@ -0,0 +1,70 @@
+import os
+import tempfile
+
+# The app reads its settings at import time, so point it at a throwaway
+# SQLite database before any test module imports it.
+os.environ["SQLALCHEMY_DATABASE_URI"] = (
+    f"sqlite:///{tempfile.mkdtemp(prefix='pokemon-tests-')}/pokemon.db"
+)
+os.environ.setdefault("POKEMON_API_URL", "http://127.0.0.1:8765/api/v2/pokemon")
+os.environ.setdefault("SECRET_KEY", "tests")
+os.environ.setdefault("JWT_SECRET_KEY", "tests")
+os.environ["INGEST_WORKERS"] = "0"
+os.environ["PARSE_WORKERS"] = "0"
+os.environ["RESPONSE_CACHE_TTL"] = "0"
+
+import pytest  # noqa: E402
+from app import create_app  # noqa: E402
+from benchmarks import payloads  # noqa: E402
+from libs import pokemon_parser  # noqa: E402
+from libs.models import users  # noqa: E402
+from libs.pokemon_db_client import PokemonClientDB  # noqa: E402
+from libs.pokemon_reference_cache import reference_cache  # noqa: E402
+from sqlmodel import Session  # noqa: E402
+
+
+@pytest.fixture
+def database():
+    """Empty tables for every test."""
+    users.SQLModel.metadata.drop_all(users.engine)
+    users.SQLModel.metadata.create_all(users.engine)
+    reference_cache.clear()
+    yield users.engine
+    users.engine.dispose()
+
+
+@pytest.fixture
+def sample_payloads():
+    return payloads.make_payloads(20, seed=7)
+
+
+@pytest.fixture
+def db_client(database, sample_payloads):
+    """A ``PokemonClientDB`` over a database holding ``sample_payloads``."""
+    with Session(database) as session:
+        client = PokemonClientDB(session=session)
+        client.bulk_create(
+            [pokemon_parser.parser_payload(payload) for payload in sample_payloads]
+        )
+        yield client
+
+
+@pytest.fixture
+def app(database):
+    app = create_app()
+    app.config["TESTING"] = True
+    return app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def auth_headers(client):
+    """Bearer header of a freshly registered user."""
+    credentials = {"username": "tester", "password": "secret"}
+    client.post("/auth/register", json=credentials)
+    token = client.post("/auth/login", json=credentials).json["access_token"]
+    return {"Authorization": f"Bearer {token}"}
@@ -0,0 +1,74 @@
+import copy
+
+from libs import pokemon_parser
+from libs.models import aggregates
+from libs.models import users
+from sqlmodel import select
+
+
+def stored(db_client, model, key):
+    rows = db_client.session.execute(select(model.__table__)).mappings()
+    return {row[key]: dict(row) for row in rows}
+
+
+def recounted(rows, key):
+    return {row[key]: row for row in rows}
+
+
+def assert_aggregates_match_links(db_client):
+    assert stored(db_client, aggregates.TypeCount, "type_id") == recounted(
+        db_client.type_count_rows(), "type_id"
+    )
+    assert stored(db_client, aggregates.StatAggregate, "stat_id") == recounted(
+        db_client.stat_aggregate_rows(), "stat_id"
+    )
+
+
+def rewrite(db_client, payloads):
+    db_client.bulk_create(
+        [pokemon_parser.parser_payload(payload) for payload in payloads]
+    )
+
+
+def test_first_write_builds_the_aggregates(db_client):
+    assert_aggregates_match_links(db_client)
+
+
+def test_rewrites_apply_deltas(db_client, sample_payloads):
+    changed = copy.deepcopy(sample_payloads[:10])
+    for index, payload in enumerate(changed):
+        stats = payload["stats"]
+        # Raise one stat, drop the extreme of another and lose a type.
+        stats[0]["base_stat"] += 7
+        stats[1]["base_stat"] = 1 if index % 2 else 255
+        if index % 3 == 0:
+            del stats[-1]
+        if len(payload["types"]) > 1:
+            del payload["types"][-1]
+        else:
+            payload["types"][0]["slot"] = 2
+    rewrite(db_client, changed)
+    assert_aggregates_match_links(db_client)
+
+    rewrite(db_client, copy.deepcopy(sample_payloads[:10]))
+    assert_aggregates_match_links(db_client)
+
+
+def test_names_come_from_the_batch_when_the_reference_cache_is_stale(
+    db_client, sample_payloads
+):
+    # The database is reset while the process still remembers its types and
+    # stats, so the rewrite skips their rows.
+    db_client.session.close()
+    users.SQLModel.metadata.drop_all(users.engine)
+    users.SQLModel.metadata.create_all(users.engine)
+    rewrite(db_client, sample_payloads[:3])
+    type_names = {
+        entry["type"]["name"]
+        for payload in sample_payloads[:3]
+        for entry in payload["types"]
+    }
+    stored_types = stored(db_client, aggregates.TypeCount, "type_id").values()
+    assert {row["type_name"] for row in stored_types} == type_names
+    stored_stats = stored(db_client, aggregates.StatAggregate, "stat_id").values()
+    assert {row["count"] for row in stored_stats} == {3}
@@ -0,0 +1,45 @@
+from unittest import mock
+
+from libs.models import pokemon
+from libs.pokemon_bulk_load import BulkLoader
+from sqlalchemy.dialects import postgresql
+from sqlmodel import Session, select
+
+
+def postgresql_loader():
+    session = mock.MagicMock()
+    session.get_bind.return_value.dialect = postgresql.dialect()
+    return BulkLoader(session), session
+
+
+def test_postgresql_merge_keeps_the_last_staged_row_of_each_key():
+    loader, session = postgresql_loader()
+    with mock.patch.object(loader, "copy"):
+        loader.add({pokemon.Type: [{"id": 1, "name": "grass", "url": None}]})
+    loader.merge(pokemon.Type)
+    sql = str(session.execute.call_args.args[0])
+    assert "SELECT DISTINCT ON (id) id, name, url FROM staging_type" in sql
+    assert "ORDER BY id, staging_seq DESC" in sql
+    assert "staging_seq" not in sql.split("SELECT")[0]
+
+
+def test_columns_first_seen_in_a_later_batch_are_written(database):
+    with Session(database) as session:
+        loader = BulkLoader(session)
+        loader.add({pokemon.Type: [{"id": 1, "name": "grass"}]})
+        loader.add({pokemon.Type: [{"id": 2, "name": "fire", "url": "/type/2/"}]})
+        loader.finish()
+        rows = session.exec(select(pokemon.Type).order_by(pokemon.Type.id)).all()
+    assert [(row.name, row.url) for row in rows] == [
+        ("grass", None),
+        ("fire", "/type/2/"),
+    ]
+
+
+def test_postgresql_merge_reads_every_column_any_batch_staged():
+    loader, session = postgresql_loader()
+    with mock.patch.object(loader, "copy"):
+        loader.add({pokemon.Type: [{"id": 1, "name": "grass"}]})
+        loader.add({pokemon.Type: [{"id": 2, "name": "fire", "url": "/type/2/"}]})
+    loader.merge(pokemon.Type)
+    assert "INSERT INTO type (id, name, url)" in str(session.execute.call_args.args[0])
@@ -0,0 +1,46 @@
+from collections import Counter
+
+from libs.models import users
+from sqlalchemy import event
+
+
+def count_statements(call):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    event.listen(users.engine, "before_cursor_execute", record)
+    try:
+        result = call()
+    finally:
+        event.remove(users.engine, "before_cursor_execute", record)
+    return result, len(statements)
+
+
+def test_full_pokemons_query_count_does_not_grow_with_the_page(db_client):
+    one, one_count = count_statements(lambda: db_client.get_full_pokemons(pokemon_id=1))
+    db_client.session.expunge_all()
+    many, many_count = count_statements(lambda: db_client.get_full_pokemons(limit=20))
+    assert len(one) == 1
+    assert len(many) == 20
+    assert one_count == many_count == 7
+
+
+def test_full_pokemons_by_type_query_count_does_not_grow_with_the_page(
+    db_client, sample_payloads
+):
+    (type_name, _), *_ = Counter(
+        entry["type"]["name"]
+        for payload in sample_payloads
+        for entry in payload["types"]
+    ).most_common(1)
+    _, one_count = count_statements(
+        lambda: db_client.get_full_pokemons(type_filter=type_name, limit=1)
+    )
+    db_client.session.expunge_all()
+    many, many_count = count_statements(
+        lambda: db_client.get_full_pokemons(type_filter=type_name)
+    )
+    assert len(many) > 1
+    assert one_count == many_count
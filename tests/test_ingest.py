@@ -0,0 +1,69 @@
+import copy
+from concurrent.futures import ThreadPoolExecutor
+
+from libs import pokemon_ingest
+from libs.models import pokemon, users
+from sqlmodel import select
+
+
+def batch_of(payloads):
+    return [(payload["name"], payload) for payload in payloads]
+
+
+def statuses(results):
+    return [result["status"] for result in results]
+
+
+def stored_links(model, pokemon_id, key):
+    with users.get_session() as session:
+        return set(
+            session.exec(
+                select(getattr(model, key)).where(model.pokemon_id == pokemon_id)
+            ).all()
+        )
+
+
+def test_unchanged_payloads_are_skipped(database, sample_payloads):
+    batch = batch_of(sample_payloads[:5])
+    assert statuses(pokemon_ingest.write_batch(batch)) == ["ingested"] * 5
+    assert statuses(pokemon_ingest.write_batch(batch)) == ["unchanged"] * 5
+
+
+def test_force_rewrites_unchanged_payloads(database, sample_payloads):
+    batch = batch_of(sample_payloads[:5])
+    pokemon_ingest.write_batch(batch)
+    assert statuses(pokemon_ingest.write_batch(batch, force=True)) == ["ingested"] * 5
+
+
+def test_changed_payload_removes_stale_links(database, sample_payloads):
+    payload = copy.deepcopy(sample_payloads[0])
+    while len(payload["types"]) < 2:
+        payload["types"].append(copy.deepcopy(sample_payloads[1]["types"][0]))
+    pokemon_ingest.write_batch(batch_of([payload]))
+    kept_type = payload["types"][0]["type"]["url"]
+    kept_moves = payload["moves"][:1]
+    assert len(stored_links(pokemon.PokemonType, payload["id"], "type_id")) == 2
+
+    changed = copy.deepcopy(payload)
+    changed["types"] = changed["types"][:1]
+    changed["moves"] = kept_moves
+    assert statuses(pokemon_ingest.write_batch(batch_of([changed]))) == ["ingested"]
+    type_ids = stored_links(pokemon.PokemonType, payload["id"], "type_id")
+    assert type_ids == {int(kept_type.rstrip("/").rsplit("/", 1)[1])}
+    move_ids = stored_links(pokemon.PokemonMove, payload["id"], "move_id")
+    assert move_ids == {
+        int(move["move"]["url"].rstrip("/").rsplit("/", 1)[1]) for move in kept_moves
+    }
+
+
+def test_parse_pool_path_skips_unchanged_payloads(database, sample_payloads):
+    batch = batch_of(sample_payloads[:5])
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        first = pokemon_ingest.finish_batch(
+            *pokemon_ingest.submit_batch(executor, batch)
+        )
+        again = pokemon_ingest.finish_batch(
+            *pokemon_ingest.submit_batch(executor, batch)
+        )
+    assert statuses(first) == ["ingested"] * 5
+    assert statuses(again) == ["unchanged"] * 5
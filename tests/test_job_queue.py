@@ -0,0 +1,73 @@
+import threading
+import time
+from datetime import timedelta
+
+from libs import pokemon_job_queue as queue
+from libs.models.jobs import IngestJob, utcnow
+
+
+class FakeAPIClient:
+    cache_stats = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+def make_stale(job_id):
+    with queue.users.get_session() as session:
+        job = session.get(IngestJob, job_id)
+        job.updated_at = utcnow() - timedelta(seconds=3600)
+        session.add(job)
+        session.commit()
+
+
+def test_requeued_job_is_only_finalized_by_its_new_worker(database, monkeypatch):
+    job = queue.enqueue(["bulbasaur", "ivysaur"])
+    assert queue.claim_next("first") == job.id
+    taken_over = threading.Event()
+
+    def first_ingest(api, pokemons, concurrency, force=False):
+        # The first worker stalls long enough for its job to be requeued and
+        # claimed by the second one.
+        make_stale(job.id)
+        queue.requeue_stale()
+        assert queue.claim_next("second") == job.id
+        taken_over.set()
+        yield {"pokemon": "bulbasaur", "status": "ingested"}
+        yield {"pokemon": "ivysaur", "status": "ingested"}
+
+    monkeypatch.setattr(queue.pokemon_api_client, "PokemonAPIClient", FakeAPIClient)
+    monkeypatch.setattr(queue.pokemon_ingest, "ingest_pokemons", first_ingest)
+    monkeypatch.setattr(queue.config, "INGEST_PROGRESS_INTERVAL", 0)
+    queue.run_job(job.id, "first")
+    assert taken_over.is_set()
+    stored = queue.get_job(job.id)
+    assert (stored.status, stored.worker, stored.processed) == ("running", "second", 0)
+
+    def second_ingest(api, pokemons, concurrency, force=False):
+        yield {"pokemon": "bulbasaur", "status": "unchanged"}
+        yield {"pokemon": "ivysaur", "status": "unchanged"}
+
+    monkeypatch.setattr(queue.pokemon_ingest, "ingest_pokemons", second_ingest)
+    queue.run_job(job.id, "second")
+    stored = queue.get_job(job.id)
+    assert stored.status == "finished"
+    assert [result["status"] for result in stored.results] == ["unchanged"] * 2
+
+    # The first worker's crash handler cannot touch it either.
+    assert not queue.update_job(job.id, owned_by="first", status="failed")
+    assert queue.get_job(job.id).status == "finished"
+
+
+def test_heartbeat_keeps_a_slow_job_from_going_stale(database, monkeypatch):
+    job = queue.enqueue(["bulbasaur"])
+    assert queue.claim_next("worker") == job.id
+    monkeypatch.setattr(queue.config, "INGEST_JOB_STALE_SECONDS", 0.2)
+    with queue.Heartbeat(job.id, "worker", interval=0.05):
+        time.sleep(0.3)
+        queue.requeue_stale()
+    stored = queue.get_job(job.id)
+    assert (stored.status, stored.worker) == ("running", "worker")
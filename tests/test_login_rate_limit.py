@@ -0,0 +1,26 @@
+from libs.auth_cache import LoginRateLimiter
+
+
+def test_only_failed_attempts_count():
+    limiter = LoginRateLimiter(attempts=2, window=60)
+    key = ("ash", "10.0.0.1")
+    limiter.fail(key)
+    assert limiter.retry_after(key) == 0
+    limiter.fail(key)
+    assert 0 < limiter.retry_after(key) <= 60
+
+
+def test_success_clears_the_failures():
+    limiter = LoginRateLimiter(attempts=2, window=60)
+    key = ("ash", "10.0.0.1")
+    limiter.fail(key)
+    limiter.reset(key)
+    limiter.fail(key)
+    assert limiter.retry_after(key) == 0
+
+
+def test_failures_from_another_address_do_not_lock_the_user_out():
+    limiter = LoginRateLimiter(attempts=1, window=60)
+    limiter.fail(("ash", "10.0.0.1"))
+    assert limiter.retry_after(("ash", "10.0.0.1"))
+    assert limiter.retry_after(("ash", "10.0.0.2")) == 0
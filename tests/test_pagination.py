@@ -0,0 +1,70 @@
+import json
+from collections import Counter
+
+
+def walk_pages(client, url, headers, limit):
+    """Every row of ``url``, following ``X-Next-Cursor`` page by page."""
+    rows = []
+    cursor = None
+    while True:
+        page_url = f"{url}&limit={limit}" + (f"&after_id={cursor}" if cursor else "")
+        response = client.get(page_url, headers=headers)
+        assert response.status_code == 200
+        rows.extend(response.json)
+        cursor = response.headers.get("X-Next-Cursor")
+        if cursor is None:
+            return rows
+
+
+def ndjson(client, url, headers):
+    response = client.get(url, headers=headers)
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    return [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+
+def common_type(sample_payloads):
+    (name, _), *_ = Counter(
+        entry["type"]["name"]
+        for payload in sample_payloads
+        for entry in payload["types"]
+    ).most_common(1)
+    return name
+
+
+def test_species_pages_return_every_pokemon_once_in_order(
+    db_client, client, auth_headers, sample_payloads
+):
+    rows = walk_pages(client, "/v1/pokemon/with-species?", auth_headers, limit=3)
+    ids = [row["id"] for row in rows]
+    assert ids == sorted(payload["id"] for payload in sample_payloads)
+
+
+def test_type_pages_return_every_match_once_in_order(
+    db_client, client, auth_headers, sample_payloads
+):
+    type_name = common_type(sample_payloads)
+    expected = sorted(
+        payload["id"]
+        for payload in sample_payloads
+        if type_name in {entry["type"]["name"] for entry in payload["types"]}
+    )
+    rows = walk_pages(client, f"/v1/pokemon?type={type_name}", auth_headers, limit=2)
+    assert [row["id"] for row in rows] == expected
+
+
+def test_species_stream_matches_the_json_response(db_client, client, auth_headers):
+    pages = client.get("/v1/pokemon/with-species", headers=auth_headers).json
+    streamed = ndjson(client, "/v1/pokemon/with-species?stream=true", auth_headers)
+    assert sorted(streamed, key=lambda row: row["id"]) == sorted(
+        pages, key=lambda row: row["id"]
+    )
+
+
+def test_type_stream_matches_the_json_response(
+    db_client, client, auth_headers, sample_payloads
+):
+    url = f"/v1/pokemon?type={common_type(sample_payloads)}"
+    rows = walk_pages(client, url, auth_headers, limit=100)
+    streamed = ndjson(client, f"{url}&stream=true", auth_headers)
+    assert streamed == rows
@@ -0,0 +1,35 @@
+import pytest
+from benchmarks import payloads
+from libs import pokemon_parser as parser
+from libs.pokemon_db_client import PokemonClientDB
+
+
+def edge_payloads():
+    """Payloads at the edges of the list sizes the sanitizers handle."""
+    smallest = payloads.make_payload(9001, n_moves=0, n_abilities=1, n_forms=1)
+    smallest["cries"]["legacy"] = None
+    largest = payloads.make_payload(9002, n_moves=120, n_abilities=3, n_forms=3)
+    return [smallest, largest]
+
+
+@pytest.mark.parametrize("entity", parser.PERSISTED_ENTITIES)
+def test_dict_and_pandas_build_the_same_records(sample_payloads, entity):
+    for payload in sample_payloads + edge_payloads():
+        records = parser.parser_payload(payload, mode="dict")[entity]
+        assert records == parser.parser_payload(payload, mode="pandas")[entity]
+
+
+def test_dict_and_pandas_persist_the_same_rows(sample_payloads):
+    for payload in sample_payloads + edge_payloads():
+        dict_rows = PokemonClientDB.rows_from_parsed(
+            parser.parser_payload(payload, mode="dict")
+        )
+        pandas_rows = PokemonClientDB.rows_from_parsed(
+            parser.parser_payload(payload, mode="pandas")
+        )
+        assert dict_rows == pandas_rows
+
+
+@pytest.mark.parametrize("entity", parser.BUILDERS)
+def test_every_builder_can_build_a_batch(entity):
+    assert callable(getattr(parser.BUILDERS[entity], "build_batch_df", None))
@@ -0,0 +1,55 @@
+from libs.models import users
+from sqlalchemy import event, text
+
+
+def query_plans(db_client, call):
+    """``EXPLAIN QUERY PLAN`` details of every statement ``call`` executes."""
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(users.engine, "before_cursor_execute", record)
+    try:
+        call()
+    finally:
+        event.remove(users.engine, "before_cursor_execute", record)
+    db_client.session.execute(text("ANALYZE"))
+    cursor = db_client.session.connection().connection.cursor()
+    try:
+        return [
+            " | ".join(
+                row[3] for row in cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+            )
+            for sql, params in statements
+        ]
+    finally:
+        cursor.close()
+
+
+def test_type_filter_uses_the_type_index(db_client):
+    (plan,) = query_plans(db_client, lambda: db_client.get_pokemon_by_type("type-1"))
+    assert "ix_type_name" in plan
+    assert "ix_pokemontype_type_id" in plan
+
+
+def test_stat_filter_reads_only_the_covering_index(db_client):
+    (plan,) = query_plans(db_client, lambda: db_client.stat_aggregate_rows([1, 2]))
+    assert "COVERING INDEX ix_pokemonstat_stat_id_base_stat" in plan
+
+
+def test_keyset_pages_seek_the_pokemon_primary_key(db_client):
+    (plan,) = query_plans(
+        db_client, lambda: db_client.get_pokemons_by_species(after_id=10, limit=5)
+    )
+    assert "SEARCH pokemon USING INTEGER PRIMARY KEY (rowid>?)" in plan
+    assert "SCAN pokemon" not in plan
+
+
+def test_top_pokemons_walk_the_base_experience_index(db_client):
+    for order_by in ("base_experience_desc", "base_experience_asc"):
+        (plan,) = query_plans(
+            db_client, lambda: db_client.get_top_pokemons(5, order_by)
+        )
+        assert "ix_pokemon_base_experience" in plan
+        assert "TEMP B-TREE" not in plan
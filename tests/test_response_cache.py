@@ -0,0 +1,46 @@
+import copy
+
+import pytest
+from libs import pokemon_ingest
+from libs.response_cache import DiskBackend, MemoryBackend, response_cache
+
+
+@pytest.fixture(params=["memory", "disk"])
+def cache_backend(request, tmp_path, monkeypatch):
+    if request.param == "memory":
+        backend = MemoryBackend(max_size=100)
+    else:
+        backend = DiskBackend(tmp_path / "responses", max_size=100)
+    monkeypatch.setattr(response_cache, "backend", backend)
+    monkeypatch.setattr(response_cache, "ttl", 60)
+    return backend
+
+
+def test_a_write_to_a_read_table_drops_the_cached_response(
+    db_client, client, auth_headers, sample_payloads, cache_backend
+):
+    url = "/v1/pokemon/with-species"
+    first = client.get(url, headers=auth_headers)
+    second = client.get(url, headers=auth_headers)
+    assert first.headers["X-Cache"] == "MISS"
+    assert second.headers["X-Cache"] == "HIT"
+    assert second.json == first.json
+
+    renamed = copy.deepcopy(sample_payloads[0])
+    renamed["species"]["name"] = "renamed-species"
+    pokemon_ingest.write_batch([(renamed["name"], renamed)])
+
+    third = client.get(url, headers=auth_headers)
+    assert third.headers["X-Cache"] == "MISS"
+    species = {row["id"]: row["species"] for row in third.json}
+    assert species[renamed["id"]] == "renamed-species"
+    assert client.get(url, headers=auth_headers).headers["X-Cache"] == "HIT"
+
+
+def test_a_write_to_other_tables_keeps_the_cached_response(
+    db_client, client, auth_headers, sample_payloads, cache_backend
+):
+    url = "/v1/stats/hp/average"
+    assert client.get(url, headers=auth_headers).headers["X-Cache"] == "MISS"
+    response_cache.invalidate(["move"])
+    assert client.get(url, headers=auth_headers).headers["X-Cache"] == "HIT"
@@ -0,0 +1,43 @@
+import pytest
+from libs.models import users
+from sqlmodel import select
+
+
+def test_one_session_per_app_context(app):
+    with app.app_context():
+        with users.get_session() as first, users.get_session() as second:
+            assert first is second
+        with app.app_context():
+            with users.get_session() as nested:
+                assert nested is not first
+
+
+def test_sessions_outside_flask_are_not_shared(database):
+    with users.get_session() as first, users.get_session() as second:
+        assert first is not second
+
+
+def test_teardown_releases_the_connection(app):
+    pool = users.engine.pool
+    with app.app_context():
+        with users.get_session() as session:
+            session.exec(select(users.User)).all()
+        assert pool.checkedout() == 1
+    assert pool.checkedout() == 0
+
+
+def test_requests_do_not_keep_connections(client, auth_headers):
+    response = client.get("/v1/pokemon/with-species", headers=auth_headers)
+    assert response.status_code == 200
+    assert users.engine.pool.checkedout() == 0
+
+
+def test_errors_roll_the_request_session_back(app):
+    with app.app_context():
+        with pytest.raises(RuntimeError):
+            with users.get_session() as session:
+                session.add(users.User(username="ghost", hashed_password="x"))
+                session.flush()
+                raise RuntimeError("boom")
+        with users.get_session() as session:
+            assert session.exec(select(users.User)).all() == []
@@ -0,0 +1,64 @@
+import threading
+from collections import defaultdict
+
+from libs import pokemon_stats
+
+
+def snapshot_of(db_client, lock=None):
+    return pokemon_stats.StatsSnapshot(db_client.get_stat_values(), lock=lock)
+
+
+def test_single_pass_rows_keep_one_value_per_pokemon_stat(db_client, sample_payloads):
+    snapshot = snapshot_of(db_client)
+
+    for payload in sample_payloads:
+        for stat in payload["stats"]:
+            ids, values, _ = snapshot.stats[stat["stat"]["name"]]
+            assert list(ids).count(payload["id"]) == 1
+            assert values[list(ids).index(payload["id"])] == stat["base_stat"]
+
+
+def test_type_summaries_match_payloads(db_client, sample_payloads):
+    expected = defaultdict(list)
+    for payload in sample_payloads:
+        base_stat = next(
+            stat["base_stat"]
+            for stat in payload["stats"]
+            if stat["stat"]["name"] == "hp"
+        )
+        for link in payload["types"]:
+            expected[link["type"]["name"]].append(base_stat)
+
+    summary = snapshot_of(db_client).summary("hp", group_by="type")
+
+    assert {name: group["count"] for name, group in summary.items()} == {
+        name: len(values) for name, values in expected.items()
+    }
+    for name, values in expected.items():
+        assert summary[name]["min"] == min(values)
+        assert summary[name]["max"] == max(values)
+
+
+def test_summary_cache_is_shared_safely_between_threads(db_client, monkeypatch):
+    monkeypatch.setattr(pokemon_stats, "MAX_CACHED_SUMMARIES", 4)
+    snapshot = snapshot_of(db_client, lock=threading.Lock())
+    stats = sorted(snapshot.stats)
+    errors = []
+
+    def summarize(offset):
+        try:
+            for bins in range(1, 40):
+                stat = stats[(offset + bins) % len(stats)]
+                for group_by in (None, "type", "species"):
+                    snapshot.summary(stat, group_by=group_by, bins=bins)
+        except Exception as error:  # noqa: BLE001
+            errors.append(error)
+
+    threads = [threading.Thread(target=summarize, args=(n,)) for n in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert errors == []
+    assert len(snapshot._summaries) <= 4